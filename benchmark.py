@@ -0,0 +1,131 @@
+"""
+Headless benchmark for comparing raycaster configurations.
+
+Renders a number of frames from fixed camera positions in the default campaign's first level and prints the average
+time per frame, the same way core.py reports cast times, for each raycaster configuration.
+
+Usage:
+    python3 benchmark.py [--frames N] [--width W] [--height H]
+"""
+import argparse
+import math
+import os
+
+# No window is needed to time the renderer
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+from timeit import default_timer as timer
+
+from engine.asset_loaders.level_loader import LevelLoader
+from engine.entities.player import Player
+from engine.raycaster import RayCaster
+from engine.surfaces.slice_cache import SliceCache
+from engine.surfaces.surface_map import SurfaceMap
+from engine.surfaces.surface_tile import SurfaceTile
+
+LEVEL_PATH = os.path.join('assets', 'campaigns', 'default_campaign', 'levels', 'level_01.json')
+FIELD_OF_VIEW = 75 * (3.14159265 / 180)
+
+# Camera (x, y, angle) to start rendering from, and how far the camera moves forward and turns each frame
+SCENARIOS = {
+    'spawn': (3.456, 2.345, 1.523, 0, 0),
+    'long_view': (1.5, 1.5, 0.6, 0, 0),
+    'turning': (3.456, 2.345, 1.523, 0, Player.TURNSPEED),
+    'walking': (1.5, 1.5, 0.6, 0.02, 0),
+    # pressed against the top wall, so the columns are many times the height of the screen
+    'wall_contact': (1.5, 1.01, -1.4, 0, 0),
+}
+
+# Settings for each configuration being compared. 'raycaster' is passed to RayCaster as keyword arguments,
+# 'slice_cache_mb' sets up the slice cache and 'mipmaps' turns on mipmaps for the textures, as the GameManager would.
+CONFIGURATIONS = {
+    'loop': {'raycaster': {'backend': RayCaster.LOOP_BACKEND}},
+    'numpy': {'raycaster': {'backend': RayCaster.NUMPY_BACKEND}},
+    'numpy+cache': {'raycaster': {'backend': RayCaster.NUMPY_BACKEND}, 'slice_cache_mb': 32},
+    'numpy+mips': {'raycaster': {'backend': RayCaster.NUMPY_BACKEND}, 'mipmaps': True},
+    'numpy+raster': {'raycaster': {'backend': RayCaster.NUMPY_BACKEND,
+                                   'wall_renderer': RayCaster.SURFARRAY_RENDERER}},
+    'workers': {'raycaster': {'render_workers': os.cpu_count() or 1}},
+    'raster@0.5': {'raycaster': {'backend': RayCaster.NUMPY_BACKEND, 'wall_renderer': RayCaster.SURFARRAY_RENDERER,
+                                 'render_scale': 0.5}},
+    'raster+turn': {'raycaster': {'backend': RayCaster.NUMPY_BACKEND, 'wall_renderer': RayCaster.SURFARRAY_RENDERER,
+                                  'column_reuse': True}},
+    'raster+reuse': {'raycaster': {'backend': RayCaster.NUMPY_BACKEND, 'wall_renderer': RayCaster.SURFARRAY_RENDERER,
+                                   'frame_reuse': True}},
+}
+
+
+def time_frames(raycaster: RayCaster, x: float, y: float, angle: float, move: float, turn: float,
+                frames: int) -> float:
+    """
+    Render the given number of frames, moving the camera between each.
+
+    :return: the average time per frame, and the average time of that spent on the floor and ceiling
+    """
+    background = pygame.Surface(raycaster.output_surface.get_size())
+    frame_ts = []
+    floor_ts = []
+    for _ in range(frames):
+        raycaster.output_surface.blit(background, (0, 0))
+        start = timer()
+        raycaster.cast(x, y, angle)
+        raycaster.render_game_objects(x, y, angle)
+        raycaster.present()
+        frame_ts.append(timer() - start)
+        floor_ts.append(raycaster.floor_time)
+
+        x += move * math.cos(angle)
+        y += move * math.sin(angle)
+        angle += turn
+    return float(np.average(frame_ts)), float(np.average(floor_ts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    args = parser.parse_args()
+
+    pygame.init()
+    display_surface = pygame.display.set_mode((args.width, args.height))
+    level_data = LevelLoader.load_level_data_from_file(LEVEL_PATH)
+
+    for config_name, settings in CONFIGURATIONS.items():
+        slice_cache_mb = settings.get('slice_cache_mb', 0)
+        SurfaceTile.slice_cache = SliceCache(slice_cache_mb * 1024 * 1024) if slice_cache_mb else None
+        SurfaceMap.mipmaps = settings.get('mipmaps', False)
+
+        level = LevelLoader.create_level_from_data(level_data)
+        if SurfaceMap.mipmaps:
+            print(f"{config_name:>12} wall mipmaps: {level.wall_surface_map.get_mipmap_bytes()} bytes")
+        raycaster = RayCaster(display_surface, level, FIELD_OF_VIEW, **settings['raycaster'])
+        for scenario_name, scenario in SCENARIOS.items():
+            av, floor_av = time_frames(raycaster, *scenario, args.frames)
+            print(f"{config_name:>12} {scenario_name:>12}: avg frame time {av:.5f}s ({1 / av:.1f} fps), "
+                  f"of which floor {floor_av:.5f}s")
+            print(f"{config_name:>12} {scenario_name:>12}: objects culled {raycaster.culled_object_count}, "
+                  f"drawn {raycaster.drawn_object_count} (last frame)")
+            if raycaster.frame_reuse:
+                print(f"{config_name:>12} {scenario_name:>12}: reused frames {raycaster.reused_frame_count}, "
+                      f"reused walls {raycaster.reused_wall_count}")
+            if raycaster.column_reuse:
+                print(f"{config_name:>12} {scenario_name:>12}: reused columns {raycaster.reused_column_count}")
+            if raycaster.striped_renderer:
+                print(f"{config_name:>12} {scenario_name:>12}: worker times {raycaster.striped_renderer.worker_timings}")
+
+        print(f"{config_name:>12} wall slices made: {level.wall_surface_map.get_slice_count()}")
+        if SurfaceTile.slice_cache:
+            print(f"{config_name:>12} slice cache: {SurfaceTile.slice_cache.stats()}")
+
+        raycaster.close()
+        # so the next configuration loads the textures again, e.g. with or without mipmaps
+        level.release_assets()
+
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
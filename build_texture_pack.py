@@ -0,0 +1,29 @@
+"""
+Compiles the textures into a single texture pack, which the game memory maps rather than loading the PNGs one by one
+(see engine/asset_loaders/texture_pack.py). Run it again after changing any texture: textures whose PNGs have changed
+since the pack was built are loaded from the PNGs instead.
+
+Usage:
+    python3 build_texture_pack.py [--mipmaps]
+"""
+import argparse
+import os
+
+from engine.asset_loaders.surface_map_loader import TEXTURE_PACK_PATH, TEXTURES_BASE_PATH
+from engine.asset_loaders.texture_pack import build_texture_pack
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mipmaps', action='store_true', help="also store each tile's mip levels")
+    args = parser.parse_args()
+
+    index = build_texture_pack(TEXTURES_BASE_PATH, TEXTURE_PACK_PATH, mipmaps=args.mipmaps)
+    for file_path, entry in index['textures'].items():
+        print(f"{file_path}: {entry['width']}x{entry['height']}{'' if entry['opaque'] else ', transparent'}")
+    pack_size = os.path.getsize(TEXTURE_PACK_PATH)
+    print(f"Wrote {len(index['textures'])} textures to {TEXTURE_PACK_PATH} ({pack_size} bytes)")
+
+
+if __name__ == '__main__':
+    main()
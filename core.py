@@ -4,6 +4,7 @@ from timeit import default_timer as timer
 import pygame
 import pygame_gui
 
+from engine.asset_loaders.asset_cache import AssetCache
 from engine.asset_loaders.campaign_loader import CampaignLoader
 from engine.asset_loaders.level_loader import LevelLoader
 from engine.game_manager import GameManager
@@ -20,6 +21,8 @@ from engine.input.input_handler import InputHandler
 from engine.level_objects.level import Level
 from engine.entities.player import Player
 from engine.raycaster import RayCaster
+from engine.surfaces.surface_map import SurfaceMap
+from engine.surfaces.surface_tile import SurfaceTile
 
 
 
@@ -47,10 +50,20 @@ def load_level(level_data: dict, player_health: int, game_manager: GameManager):
     player.hp = player_health
 
     # Create game objects
-    raycaster = RayCaster(display_surface=game_manager.display_surface, level=level, fov=game_manager.field_of_view, dev_mode=game_manager.dev_mode)
+    raycaster = RayCaster(display_surface=game_manager.display_surface, level=level, fov=game_manager.field_of_view,
+                          dev_mode=game_manager.dev_mode, backend=game_manager.get_config().cast_backend,
+                          wall_renderer=game_manager.get_config().wall_renderer,
+                          render_workers=game_manager.get_config().render_workers,
+                          render_scale=game_manager.get_config().render_scale,
+                          frame_reuse=game_manager.get_config().frame_reuse,
+                          column_reuse=game_manager.get_config().column_reuse)
     level_state = LevelManager(player, level)
     hud = HUD(level_state, game_manager.gui_manager)
 
+    if SurfaceMap.mipmaps:
+        surface_maps = {level.wall_surface_map} | {enemy.surface_map for enemy in level.enemies}
+        print(f"Mipmaps: {sum(surface_map.get_mipmap_bytes() for surface_map in surface_maps)} bytes")
+
     return level, player, level_state, raycaster, hud
 
 
@@ -108,6 +121,9 @@ def run_campaign(campaign_path: str, game_manager: GameManager):
     caster_worst = -1
     caster_best = 10
 
+    # The level before the current one, whose textures are given back once the current one has loaded
+    previous_level = None
+
     # Main campaign loop
     while not campaign.is_complete():
         # Load current level
@@ -116,10 +132,18 @@ def run_campaign(campaign_path: str, game_manager: GameManager):
             level_data, player_health, game_manager
         )
 
-        input_handler = InputHandler(level_state, game_manager.gui_manager)
+        # Textures the last level shared with this one have just been picked up again, so this only frees the rest
+        if previous_level is not None:
+            previous_level.release_assets()
+            previous_level = None
+        print(f"Asset cache: {AssetCache.default().stats()}")
+
+        input_handler = InputHandler(level_state, game_manager.gui_manager,
+                                     instant_hit=game_manager.get_config().instant_hit_weapon)
 
         # Reset performance tracking for this level
         level_caster_ts = []
+        level_floor_ts = []
         time_delta = 0
 
         # Level game loop
@@ -132,27 +156,43 @@ def run_campaign(campaign_path: str, game_manager: GameManager):
                 start = timer()
                 raycaster.cast(player.x, player.y, player.angle)
                 raycaster.render_game_objects(player.x, player.y, player.angle)
+                raycaster.present()
                 end = timer()
 
                 level_caster_ts.append(end - start)
+                level_floor_ts.append(raycaster.floor_time)
 
-                # Update the UI
+                # Update the UI, drawn over the scene at the display's native resolution
                 hud.update()
                 game_manager.gui_manager.update(time_delta)
+                game_manager.gui_manager.draw_ui(game_manager.display_surface)
 
                 pygame.display.flip()
                 game_manager.display_surface.blit(game_manager.background_surface, (0, 0))
 
-                game_manager.gui_manager.draw_ui(game_manager.display_surface)
-
                 if len(level_caster_ts) > 100:  # stop list becoming too long
                     av = np.average(level_caster_ts)
                     print(f"Caster avg cast time (last 100):{av}")
+                    if raycaster.floor_caster:
+                        print(f"Floor avg time (last 100):{np.average(level_floor_ts)}")
+                    print(f"Objects culled: {raycaster.culled_object_count}, "
+                          f"drawn: {raycaster.drawn_object_count} (last frame)")
+                    if raycaster.frame_reuse:
+                        print(f"Reused frames: {raycaster.reused_frame_count}, "
+                              f"reused walls: {raycaster.reused_wall_count}")
+                    if raycaster.column_reuse:
+                        print(f"Reused columns: {raycaster.reused_column_count}")
+                    if raycaster.striped_renderer:
+                        print(f"Render worker times (last frame): {raycaster.striped_renderer.worker_timings}")
+                    if SurfaceTile.slice_cache:
+                        print(f"Slice cache: {SurfaceTile.slice_cache.stats()}")
+                    print(f"Line of sight cache: {level.line_of_sight_cache.stats()}")
                     if av > caster_worst:
                         caster_worst = av
                     if av < caster_best:
                         caster_best = av
                     level_caster_ts = []
+                    level_floor_ts = []
 
                 # cap the framerate
                 time_delta = clock.tick(60) / 1000.0
@@ -169,6 +209,7 @@ def run_campaign(campaign_path: str, game_manager: GameManager):
             if not victory_screen.show(game_manager.display_surface, game_manager.background_surface, clock):
                 # User quit during victory screen
                 print("Exiting during victory screen")
+                level.release_assets()
                 return
 
             # Save player health
@@ -189,6 +230,15 @@ def run_campaign(campaign_path: str, game_manager: GameManager):
             print(f"Exiting: {ex}")
             break
 
+        finally:
+            raycaster.close()
+            previous_level = level
+
+    # No level comes after the last one to pick its textures up again, so give them all back
+    if previous_level is not None:
+        previous_level.release_assets()
+    print(f"Asset cache: {AssetCache.default().stats()}")
+
     # Print performance stats
     if caster_ts:
         print(f"Caster avg cast time (all levels):{np.average(caster_ts)}")
@@ -0,0 +1,116 @@
+from typing import Dict, Optional
+
+from engine.asset_loaders.surface_map_loader import SurfaceMapLoader
+from engine.surfaces.surface_map import SurfaceMap
+
+
+class AssetCache:
+    """
+    Loaded textures (SurfaceMaps) shared by everything that uses them, keyed by path, so each texture file is only
+    loaded, converted and split into tiles once however many enemies, bullets or levels use it.
+
+    Each texture has a count of how many owners (see AssetSet) hold it. Once nothing holds it, it's dropped, along with
+    any of its slices in the slice cache, so textures only used by the last level are freed when the next one starts.
+    """
+
+    # The cache shared by the whole game, see default()
+    _default: Optional['AssetCache'] = None
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.releases = 0
+
+        self._surface_maps: Dict[str, SurfaceMap] = {}
+        self._ref_counts: Dict[str, int] = {}
+
+    @classmethod
+    def default(cls) -> 'AssetCache':
+        """
+        The process wide cache, created the first time it's asked for
+        """
+        if cls._default is None:
+            cls._default = AssetCache()
+        return cls._default
+
+    def get(self, file_path: str) -> SurfaceMap:
+        """
+        Get the texture at a path (as for SurfaceMapLoader.load_surface_map), loading it if it isn't cached. This
+        doesn't hold a reference to it, see acquire.
+        """
+        surface_map = self._surface_maps.get(file_path)
+        if surface_map is not None:
+            self.hits += 1
+            return surface_map
+
+        self.misses += 1
+        surface_map = SurfaceMapLoader.load_surface_map(file_path)
+        self._surface_maps[file_path] = surface_map
+        self._ref_counts[file_path] = 0
+        return surface_map
+
+    def acquire(self, file_path: str) -> SurfaceMap:
+        """
+        Get the texture at a path and hold a reference to it, until it's given back with release.
+        """
+        surface_map = self.get(file_path)
+        self._ref_counts[file_path] += 1
+        return surface_map
+
+    def release(self, file_path: str):
+        """
+        Give back a reference to a texture taken with acquire, dropping the texture if nothing else holds it.
+        """
+        self._ref_counts[file_path] -= 1
+        if self._ref_counts[file_path] <= 0:
+            del self._ref_counts[file_path]
+            self._surface_maps.pop(file_path).evict_cached_slices()
+            self.releases += 1
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters and how much memory the cached textures' pixels use, including any mipmaps.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "releases": self.releases,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._surface_maps),
+            "used_bytes": sum(
+                surface_map.surface.get_width() * surface_map.surface.get_height() * surface_map.surface.get_bytesize()
+                + surface_map.get_mipmap_bytes()
+                for surface_map in self._surface_maps.values()
+            ),
+        }
+
+
+class AssetSet:
+    """
+    The textures one owner, e.g. a level, is using. Each texture is acquired from the cache the first time the owner
+    asks for it and held until release, so the cache counts owners rather than every enemy or bullet using a texture.
+    """
+
+    def __init__(self, cache: Optional[AssetCache] = None):
+        """
+        :param cache: the cache to take textures from, defaults to the process wide one
+        """
+        self.cache = cache or AssetCache.default()
+        self._held = set()
+
+    def get_surface_map(self, file_path: str) -> SurfaceMap:
+        if file_path in self._held:
+            return self.cache.get(file_path)
+
+        surface_map = self.cache.acquire(file_path)
+        self._held.add(file_path)
+        return surface_map
+
+    def release(self):
+        """
+        Give back every texture this owner holds.
+        """
+        for file_path in self._held:
+            self.cache.release(file_path)
+        self._held.clear()
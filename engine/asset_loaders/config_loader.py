@@ -44,7 +44,16 @@ class ConfigLoader:
             dev_mode=config_data.get('dev_mode', False),
             resolution_width=config_data['resolution']['width'],
             resolution_height=config_data['resolution']['height'],
-            field_of_view=config_data.get('field_of_view', 60)
+            field_of_view=config_data.get('field_of_view', 60),
+            cast_backend=config_data.get('cast_backend', 'loop'),
+            wall_renderer=config_data.get('wall_renderer', 'blit'),
+            slice_cache_mb=config_data.get('slice_cache_mb', 0),
+            render_workers=config_data.get('render_workers', 0),
+            render_scale=config_data.get('render_scale', 1.0),
+            frame_reuse=config_data.get('frame_reuse', False),
+            column_reuse=config_data.get('column_reuse', False),
+            mipmaps=config_data.get('mipmaps', False),
+            instant_hit_weapon=config_data.get('instant_hit_weapon', False)
         )
 
     @staticmethod
@@ -84,6 +93,54 @@ class ConfigLoader:
             if not isinstance(fov, int) or fov <= 0 or fov >= 180:
                 raise ValueError("'field_of_view' must be an integer between 1 and 179")
 
+        # Validate cast_backend if present
+        if 'cast_backend' in config_data:
+            if config_data['cast_backend'] not in ('loop', 'numpy'):
+                raise ValueError("'cast_backend' must be one of 'loop' or 'numpy'")
+
+        # Validate wall_renderer if present
+        if 'wall_renderer' in config_data:
+            if config_data['wall_renderer'] not in ('blit', 'surfarray'):
+                raise ValueError("'wall_renderer' must be one of 'blit' or 'surfarray'")
+
+        # Validate slice_cache_mb if present
+        if 'slice_cache_mb' in config_data:
+            cache_mb = config_data['slice_cache_mb']
+            if not isinstance(cache_mb, int) or cache_mb < 0:
+                raise ValueError("'slice_cache_mb' must be a non-negative integer")
+
+        # Validate render_workers if present
+        if 'render_workers' in config_data:
+            workers = config_data['render_workers']
+            if not isinstance(workers, int) or workers < 0:
+                raise ValueError("'render_workers' must be a non-negative integer")
+
+        # Validate render_scale if present
+        if 'render_scale' in config_data:
+            scale = config_data['render_scale']
+            if not isinstance(scale, (int, float)) or scale <= 0 or scale > 1:
+                raise ValueError("'render_scale' must be a number greater than 0 and at most 1")
+
+        # Validate frame_reuse if present
+        if 'frame_reuse' in config_data:
+            if not isinstance(config_data['frame_reuse'], bool):
+                raise ValueError("'frame_reuse' must be a boolean")
+
+        # Validate column_reuse if present
+        if 'column_reuse' in config_data:
+            if not isinstance(config_data['column_reuse'], bool):
+                raise ValueError("'column_reuse' must be a boolean")
+
+        # Validate mipmaps if present
+        if 'mipmaps' in config_data:
+            if not isinstance(config_data['mipmaps'], bool):
+                raise ValueError("'mipmaps' must be a boolean")
+
+        # Validate instant_hit_weapon if present
+        if 'instant_hit_weapon' in config_data:
+            if not isinstance(config_data['instant_hit_weapon'], bool):
+                raise ValueError("'instant_hit_weapon' must be a boolean")
+
         # Validate dev_mode if present
         if 'dev_mode' in config_data:
             if not isinstance(config_data['dev_mode'], bool):
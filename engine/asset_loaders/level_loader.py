@@ -1,13 +1,12 @@
 import json
 import os
-from typing import List
-
-import pygame
+from typing import List, Optional
 
+from engine.level_objects.draw_list import GameObjectGroup
 from engine.level_objects.level import Level
 from engine.level_objects.levelmap import LevelMap
 from engine.entities.enemy import Enemy
-from engine.asset_loaders.surface_map_loader import SurfaceMapLoader
+from engine.asset_loaders.asset_cache import AssetCache, AssetSet
 
 
 class LevelLoader:
@@ -88,6 +87,12 @@ class LevelLoader:
                 f"(width={width} × height={height}), got {actual_length}"
             )
 
+        # Validate floor and ceiling textures if present
+        if 'floor_texture' in map_data:
+            for field in ('floor_tile', 'ceiling_tile'):
+                if field in map_data and (not isinstance(map_data[field], int) or map_data[field] < 0):
+                    raise ValueError(f"Map field '{field}' must be a non-negative integer")
+
         # Validate player spawn
         spawn = level_data['player_spawn']
         required_spawn_fields = ['x', 'y', 'angle']
@@ -109,36 +114,58 @@ class LevelLoader:
         return True
 
     @staticmethod
-    def create_level_from_data(level_data: dict) -> Level:
+    def create_level_from_data(level_data: dict, asset_cache: Optional[AssetCache] = None) -> Level:
         """
         Create a Level object from parsed JSON data
 
         Args:
             level_data: Dict containing level data from JSON
+            asset_cache: Cache to share textures through, defaults to the process wide one. The level holds its
+                textures until Level.release_assets is called.
 
         Returns:
             Level: Initialized Level object
+
+        Raises:
+            ValueError: If the floor or ceiling tile isn't one of the floor texture's tiles
         """
+        assets = AssetSet(asset_cache)
+
         # Extract map data
         map_info = level_data['map']
         map_str = map_info['data']
         map_width = map_info.get('width', 16)
         map_height = map_info.get('height', 16)
         wall_texture_filename = map_info.get('wall_texture', 'walls.png')
-        wall_surface_map = SurfaceMapLoader.load_surface_map(wall_texture_filename)
+        wall_surface_map = assets.get_surface_map(wall_texture_filename)
+
+        # Floor and ceiling are optional, and share one texture file
+        floor_surface_map = None
+        if 'floor_texture' in map_info:
+            floor_surface_map = assets.get_surface_map(map_info['floor_texture'])
+
+            # The tiles can only be checked against the texture once it's loaded
+            tile_count = floor_surface_map.horizontal_tiles_total * floor_surface_map.vertical_tiles_total
+            for field in ('floor_tile', 'ceiling_tile'):
+                if map_info.get(field, 0) >= tile_count:
+                    assets.release()
+                    raise ValueError(
+                        f"Map field '{field}' is {map_info[field]}, but '{map_info['floor_texture']}' "
+                        f"only has {tile_count} tiles"
+                    )
 
         # Create LevelMap
         level_map = LevelMap(map_str, map_width, map_height)
 
         # Initialize sprite groups
-        enemies = pygame.sprite.Group()
-        bullets = pygame.sprite.Group()
+        enemies = GameObjectGroup()
+        bullets = GameObjectGroup()
 
         # Create enemies
         enemies_data = level_data.get('enemies', [])
         for enemy_dict in enemies_data:
-            # Load enemy texture
-            enemy_surface_map = SurfaceMapLoader.load_surface_map(enemy_dict['texture_filename'])
+            # Load enemy texture, shared by every enemy using it
+            enemy_surface_map = assets.get_surface_map(enemy_dict['texture_filename'])
 
             # Get enemy parameters with defaults
             max_hp = enemy_dict.get('max_hp', 50)
@@ -159,4 +186,5 @@ class LevelLoader:
             )
 
         # Create and return Level
-        return Level(level_map, wall_surface_map, enemies, bullets)
+        return Level(level_map, wall_surface_map, enemies, bullets, floor_surface_map=floor_surface_map,
+                     floor_tile=map_info.get('floor_tile'), ceiling_tile=map_info.get('ceiling_tile'), assets=assets)
@@ -1,21 +1,45 @@
 import os
+from typing import Optional
 
 import pygame
 
+from engine.asset_loaders.texture_pack import TexturePack
+from engine.surfaces import surface_utils
 from engine.surfaces.surface_map import SurfaceMap
 
 #Todo: move this to a config file?
 TEXTURES_BASE_PATH = os.path.join('assets', 'textures')
+# Built from TEXTURES_BASE_PATH by build_texture_pack.py
+TEXTURE_PACK_PATH = os.path.join('assets', 'textures.pack')
 
 class SurfaceMapLoader:
     """Static utility class for loading surface maps from texture files"""
 
-    
+    # The texture pack, opened the first time a texture is loaded (see get_texture_pack). False until then.
+    _texture_pack = False
 
-    @staticmethod
-    def load_surface_map(file_path: str) -> SurfaceMap:
+    @classmethod
+    def get_texture_pack(cls) -> Optional[TexturePack]:
         """
-        Load a SurfaceMap from a file path
+        The texture pack at TEXTURE_PACK_PATH, or None if there isn't a usable one
+        """
+        if cls._texture_pack is False:
+            cls._texture_pack = None
+            if os.path.exists(TEXTURE_PACK_PATH):
+                try:
+                    cls._texture_pack = TexturePack(TEXTURE_PACK_PATH, TEXTURES_BASE_PATH)
+                except (IOError, ValueError, KeyError) as e:
+                    print(f"Not using the texture pack: {e}")
+        return cls._texture_pack
+
+    @classmethod
+    def load_surface_map(cls, file_path: str) -> SurfaceMap:
+        """
+        Load a SurfaceMap from a file path. Once the display has been set up, the texture is converted to its pixel
+        format (see surface_utils.convert_for_display).
+
+        Textures are taken from the texture pack if there is one (see TexturePack), falling back to the PNG if the
+        texture isn't in it or the PNG has changed since the pack was built.
 
         Args:
             file_path: Path to the texture file (absolute or relative to project root)
@@ -27,9 +51,16 @@ class SurfaceMapLoader:
             FileNotFoundError: If texture file doesn't exist
             pygame.error: If file cannot be loaded as an image
         """
+        texture_pack = cls.get_texture_pack()
+        if texture_pack is not None:
+            surface_map = texture_pack.load_surface_map(file_path)
+            if surface_map is not None:
+                return surface_map
+
         full_path = os.path.join(TEXTURES_BASE_PATH, file_path)
         if not os.path.exists(full_path):
             raise FileNotFoundError(f"Texture file not found: {full_path}")
 
         surface = pygame.image.load(full_path)
+        surface = surface_utils.convert_for_display(surface, pygame.Color(SurfaceMap.OVERLAY_COLOR))
         return SurfaceMap(surface)
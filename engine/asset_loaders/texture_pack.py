@@ -0,0 +1,214 @@
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from engine.surfaces.surface_map import SurfaceMap
+
+MAGIC = b'RCTXPACK'
+VERSION = 1
+# magic, version, length of the index
+HEADER = struct.Struct('<8sII')
+# every block of pixels starts on a multiple of this, so the arrays over them are aligned
+ALIGNMENT = 64
+
+
+class TexturePack:
+    """
+    Every texture compiled into one file by build_texture_pack, read through a memory map.
+
+    The pack holds each texture's pixels exactly as they're needed at runtime: rows of 32 bit pixels in the byte order
+    of a convert_alpha()ed surface (BGRA, i.e. ARGB8888 on little endian machines), the tiles' pixel array
+    (SurfaceMap.build_pixel_array) and optionally each tile's mip levels, all with the overlay already transparent. So
+    loading a texture is a matter of pointing surfaces and numpy arrays at the mapped file, without decoding a PNG or
+    copying any pixels, and the OS only reads the pages which are actually touched.
+
+    The file is a header, a JSON index of the textures by path (relative to the textures directory, with / separators)
+    and then the pixels, starting at the first aligned offset after the index. Offsets in the index are from the start
+    of the pixels.
+    """
+
+    def __init__(self, pack_path: str, textures_dir: str):
+        """
+        :param textures_dir: the directory the pack was built from, to check the PNGs haven't changed since
+
+        :raises IOError: the file isn't a texture pack, or was built by a different version of this module
+        """
+        self.pack_path = pack_path
+        self.textures_dir = textures_dir
+
+        with open(pack_path, 'rb') as pack_file:
+            # ACCESS_COPY rather than ACCESS_READ because pygame surfaces need a writable buffer. Nothing writes to the
+            # pixels, but if anything did the page would be copied rather than the file changed.
+            self._mmap = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        if len(self._mmap) < HEADER.size:
+            raise IOError(f"{pack_path} is not a texture pack")
+        magic, version, index_length = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise IOError(f"{pack_path} is not a texture pack")
+        if version != VERSION:
+            raise IOError(f"{pack_path} is texture pack version {version}, expected {VERSION}")
+
+        index = json.loads(bytes(self._mmap[HEADER.size:HEADER.size + index_length]))
+        self.textures: Dict[str, dict] = index['textures']
+        self._data_start = _align(HEADER.size + index_length)
+
+    def is_stale(self, file_path: str) -> bool:
+        """
+        Whether the texture at a path (as for SurfaceMapLoader.load_surface_map) is missing from the pack, or its PNG
+        has changed since the pack was built.
+        """
+        entry = self.textures.get(_pack_key(file_path))
+        if entry is None:
+            return True
+
+        try:
+            stat = os.stat(os.path.join(self.textures_dir, file_path))
+        except OSError:
+            return True
+        return stat.st_mtime_ns != entry['source_mtime_ns'] or stat.st_size != entry['source_size']
+
+    def load_surface_map(self, file_path: str) -> Optional[SurfaceMap]:
+        """
+        Load a SurfaceMap from the pack, converted for the display like SurfaceMapLoader does with PNGs.
+
+        Without a display, or with a display in the same pixel format as the pack, the surface is a view of the pack's
+        pixels. Textures with no transparency are still converted (copied) to the display format without alpha, as
+        they blit quicker that way (see surface_utils.convert_for_display). The pixel array is always a view.
+
+        :return: the texture, or None if it's missing from the pack or stale (see is_stale)
+        """
+        if self.is_stale(file_path):
+            return None
+        entry = self.textures[_pack_key(file_path)]
+
+        width, height, tile_size = entry['width'], entry['height'], entry['tile_size']
+        surface = self._surface_at(entry['surface_offset'], (width, height))
+        surface = self._convert_for_display(surface, entry['opaque'])
+
+        tile_count = (width // tile_size) * (height // tile_size)
+        pixels = np.frombuffer(self._mmap, dtype=np.uint8, count=tile_count * tile_size * tile_size * 4,
+                               offset=self._data_start + entry['pixels_offset'])
+        pixels = pixels.reshape(tile_count, tile_size, tile_size, 4)
+
+        mip_levels = None
+        if SurfaceMap.mipmaps and entry['mip_levels']:
+            mip_levels = [
+                [self._convert_for_display(self._surface_at(offset, (mip_w, mip_h)), entry['opaque'])
+                 for mip_w, mip_h, offset in tile_mip_levels]
+                for tile_mip_levels in entry['mip_levels']
+            ]
+
+        return SurfaceMap(surface, tile_size, pixels=pixels, mip_levels=mip_levels)
+
+    def _surface_at(self, offset: int, size: Tuple[int, int]) -> pygame.Surface:
+        """
+        A surface over the BGRA pixels at an offset from the start of the pack's pixels
+        """
+        offset += self._data_start
+        length = size[0] * size[1] * 4
+        return pygame.image.frombuffer(memoryview(self._mmap)[offset:offset + length], size, 'BGRA')
+
+    @staticmethod
+    def _convert_for_display(surface: pygame.Surface, opaque: bool) -> pygame.Surface:
+        display = pygame.display.get_surface()
+        if display is None:
+            return surface
+        if opaque:
+            return surface.convert()
+        if display.get_masks()[:3] != surface.get_masks()[:3]:
+            return surface.convert_alpha()
+        return surface
+
+
+def _pack_key(file_path: str) -> str:
+    return file_path.replace(os.sep, '/')
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def find_textures(textures_dir: str) -> List[str]:
+    """
+    Every PNG under a directory, as paths relative to it, in a stable order
+    """
+    file_paths = []
+    for dir_path, dir_names, file_names in os.walk(textures_dir):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            if file_name.lower().endswith('.png'):
+                file_paths.append(os.path.relpath(os.path.join(dir_path, file_name), textures_dir))
+    return file_paths
+
+
+def build_texture_pack(textures_dir: str, pack_path: str, mipmaps: bool = False,
+                       tile_size: int = SurfaceMap.DEFAULT_TEXTURE_TILE_SIZE) -> dict:
+    """
+    Compile every PNG under textures_dir into a texture pack (see TexturePack). Textures which can't be split into tiles
+    are left out, and will be loaded from their PNGs.
+
+    :param mipmaps: also store each tile's mip levels, for when mipmaps are turned on
+    :return: the pack's index
+    """
+    textures = {}
+    blocks = []
+    offset = 0
+
+    def add_block(data: bytes) -> int:
+        nonlocal offset
+        block_offset = _align(offset)
+        blocks.append((block_offset, data))
+        offset = block_offset + len(data)
+        return block_offset
+
+    for file_path in find_textures(textures_dir):
+        full_path = os.path.join(textures_dir, file_path)
+        surface = pygame.image.load(full_path)
+        # always 32 bit with alpha, whatever the PNG was, so the overlay can be made transparent
+        surface = pygame.image.frombytes(pygame.image.tobytes(surface, 'RGBA'), surface.get_size(), 'RGBA')
+        try:
+            surface_map = SurfaceMap(surface, tile_size, mipmaps=mipmaps)
+        except IOError:
+            continue
+
+        mip_levels = []
+        if mipmaps:
+            for tile_y in range(surface_map.vertical_tiles_total):
+                for tile_x in range(surface_map.horizontal_tiles_total):
+                    mip_levels.append([
+                        [mip_level.get_width(), mip_level.get_height(),
+                         add_block(pygame.image.tobytes(mip_level, 'BGRA'))]
+                        for mip_level in surface_map.get_tile_at(tile_x, tile_y).get_mip_levels()
+                    ])
+
+        stat = os.stat(full_path)
+        textures[_pack_key(file_path)] = {
+            'source_mtime_ns': stat.st_mtime_ns,
+            'source_size': stat.st_size,
+            'width': surface.get_width(),
+            'height': surface.get_height(),
+            'tile_size': tile_size,
+            'opaque': bool(np.all(surface_map.pixels[..., 3] == 255)),
+            'surface_offset': add_block(pygame.image.tobytes(surface_map.surface, 'BGRA')),
+            'pixels_offset': add_block(surface_map.pixels.tobytes()),
+            'mip_levels': mip_levels,
+        }
+
+    index = {'textures': textures}
+    index_bytes = json.dumps(index).encode('utf-8')
+    data_start = _align(HEADER.size + len(index_bytes))
+
+    with open(pack_path, 'wb') as pack_file:
+        pack_file.write(HEADER.pack(MAGIC, VERSION, len(index_bytes)))
+        pack_file.write(index_bytes)
+        for block_offset, data in blocks:
+            pack_file.seek(data_start + block_offset)
+            pack_file.write(data)
+
+    return index
@@ -1,3 +1,5 @@
+from typing import Optional
+
 import pygame
 
 from engine.level_objects.level import Level
@@ -8,11 +10,18 @@ from engine.entities.enemy import Enemy
 class EnemyBehaviour:
     
     @classmethod
-    def act(cls, enemy: Enemy, level: Level, player: Player):
+    def act(cls, enemy: Enemy, level: Level, player: Player, can_see_player: Optional[bool] = None):
+        """
+        :param can_see_player: whether the enemy has LOS to the player, if it's already been worked out for every
+            enemy at once (see Level.lines_of_sight_to)
+        """
         if pygame.time.get_ticks() < enemy.wait_until:
             return
 
-        if level.line_of_sight_between_coords(enemy.x, enemy.y, player.x, player.y):
+        if can_see_player is None:
+            can_see_player = level.line_of_sight_between_coords(enemy.x, enemy.y, player.x, player.y)
+
+        if can_see_player:
 
             if enemy.dead:  # todo: remove dead enemies when out of LOS
                 enemy.die()
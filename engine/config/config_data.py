@@ -7,4 +7,13 @@ class Config:
     dev_mode: bool
     resolution_width: int
     resolution_height: int
-    field_of_view: int
\ No newline at end of file
+    field_of_view: int
+    cast_backend: str = 'loop'
+    wall_renderer: str = 'blit'
+    slice_cache_mb: int = 0
+    render_workers: int = 0
+    render_scale: float = 1.0
+    frame_reuse: bool = False
+    column_reuse: bool = False
+    mipmaps: bool = False
+    instant_hit_weapon: bool = False
@@ -3,6 +3,9 @@ import pygame_gui
 
 from engine.config.config_data import Config
 from engine.asset_loaders.config_loader import ConfigLoader
+from engine.surfaces.slice_cache import SliceCache
+from engine.surfaces.surface_map import SurfaceMap
+from engine.surfaces.surface_tile import SurfaceTile
 CONFIG_PATH = 'config.json'
 
 
@@ -11,7 +14,7 @@ class GameManager:
         # Load configuration
         self._config: Config = ConfigLoader.load_config(CONFIG_PATH)
         self.dev_mode: bool = self._config.dev_mode
-        
+
         # Pygame Setup
         pygame.init()
         pygame.key.set_repeat(100, 50)
@@ -22,6 +25,13 @@ class GameManager:
         self.gui_manager = pygame_gui.UIManager((self._config.resolution_width, self._config.resolution_height))
         self.field_of_view = self._config.field_of_view * (3.14159265 / 180)  # Convert degrees to radians
 
+        # Cache for scaled texture slices, shared by all textures
+        if self._config.slice_cache_mb > 0:
+            SurfaceTile.slice_cache = SliceCache(self._config.slice_cache_mb * 1024 * 1024)
+
+        # Scaled down copies of every texture tile, built as the textures are loaded
+        SurfaceMap.mipmaps = self._config.mipmaps
+
     def get_config(self) -> Config:
         """Return the configuration dataclass"""
         return self._config
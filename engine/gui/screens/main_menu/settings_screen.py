@@ -62,6 +62,15 @@ class SettingsScreen(BaseScreen):
         return (
             f"<b>Resolution:</b> {self.config.resolution_width} x {self.config.resolution_height}<br>"
             f"<b>Field of View:</b> {self.config.field_of_view} degrees<br>"
+            f"<b>Raycaster Backend:</b> {self.config.cast_backend}<br>"
+            f"<b>Wall Renderer:</b> {self.config.wall_renderer}<br>"
+            f"<b>Slice Cache:</b> {self.config.slice_cache_mb} MB<br>"
+            f"<b>Render Workers:</b> {self.config.render_workers or 'Off'}<br>"
+            f"<b>Render Scale:</b> {self.config.render_scale:g}<br>"
+            f"<b>Frame Reuse:</b> {'Enabled' if self.config.frame_reuse else 'Disabled'}<br>"
+            f"<b>Column Reuse:</b> {'Enabled' if self.config.column_reuse else 'Disabled'}<br>"
+            f"<b>Mipmaps:</b> {'Enabled' if self.config.mipmaps else 'Disabled'}<br>"
+            f"<b>Weapon:</b> {'Instant Hit' if self.config.instant_hit_weapon else 'Projectile'}<br>"
             f"<b>Developer Mode:</b> {'Enabled' if self.config.dev_mode else 'Disabled'}"
         )
 
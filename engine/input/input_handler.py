@@ -1,3 +1,5 @@
+import math
+
 import pygame
 import pygame_gui
 
@@ -6,7 +8,6 @@ from engine.entities.bullet import Bullet
 from engine.level_manager import LevelManager
 from engine.utils import math_utils
 from engine.utils.exceptions import GameExitException
-from engine.asset_loaders.surface_map_loader import SurfaceMapLoader
 
 
 class InputHandler:
@@ -14,10 +15,17 @@ class InputHandler:
     Class for handling player_objects inputs
     """
 
-    def __init__(self, level_state: LevelManager, gui_manager: pygame_gui.UIManager):
+    # How far an instant hit weapon reaches, in map squares
+    INSTANT_HIT_RANGE = 24
+
+    def __init__(self, level_state: LevelManager, gui_manager: pygame_gui.UIManager, instant_hit: bool = False):
+        """
+        :param instant_hit: shooting hits the first enemy in line straight away, rather than firing a bullet
+        """
 
         self.level_state = level_state
         self.gui_manager = gui_manager
+        self.instant_hit = instant_hit
 
         # TODO: load these from a settings file
         self.QUIT_K = pygame.K_ESCAPE
@@ -67,9 +75,14 @@ class InputHandler:
         # TODO: trigger weapon firing animation
         # TODO: Get bullet characteristics for weapon including speed, surface map, damage etc.
         b_speed = 0.2
-        b_surface_map = SurfaceMapLoader.load_surface_map('common/simple_bullet.png')
         b_damage = 25
 
+        if self.instant_hit:
+            self.player_attack_instant(b_damage)
+            return
+
+        b_surface_map = self.level_state.level.assets.get_surface_map('common/simple_bullet.png')
+
         # create bullet object with self.angle and weapon speed
         # Note: Bullet is added to the sprite group so doesn't need explicitly added to the LevelManager
         bullet = Bullet(
@@ -85,6 +98,20 @@ class InputHandler:
         # trigger bullet move immediately to get it infront of the player and check for impact
         BulletBehaviour.act(bullet, self.level_state.level, self.level_state.player)
 
+    def player_attack_instant(self, damage: int):
+        """
+        Fires an instant hit weapon: casts a ray along where the player is facing and damages the first living enemy
+        it passes through before hitting a wall, if any.
+        """
+        level = self.level_state.level
+        player = self.level_state.player
+
+        living_enemies = [enemy for enemy in level.enemies if not enemy.dead]
+        hit = level.raycast((player.x, player.y), (math.cos(player.angle), math.sin(player.angle)),
+                            self.INSTANT_HIT_RANGE, entities=living_enemies)
+        if hit.entity is not None:
+            hit.entity.take_damage(damage)
+
     def player_moves_forward(self):
         self._player_moves(self.level_state.player.MOVESPEED)
 
@@ -1,3 +1,5 @@
+import pygame
+
 from engine.behaviours.bullet_behaviour import BulletBehaviour
 from engine.behaviours.enemy_behaviour import EnemyBehaviour
 from engine.level_objects.level import Level
@@ -41,8 +43,14 @@ class LevelManager:
             raise LevelCompleteException("All enemies defeated")
 
     def trigger_enemy_behaviour(self):
-        for enemy in self.level.enemies:
-            EnemyBehaviour.act(enemy, self.level, self.player)
+        # Only enemies which have finished waiting act this tick, so only they need LOS. It's worked out for all of them
+        # in one go, so enemies in the same square share the answer.
+        now = pygame.time.get_ticks()
+        enemies = [enemy for enemy in self.level.enemies if now >= enemy.wait_until]
+        can_see_player = self.level.lines_of_sight_to([(enemy.x, enemy.y) for enemy in enemies],
+                                                      self.player.x, self.player.y)
+        for enemy, can_see in zip(enemies, can_see_player):
+            EnemyBehaviour.act(enemy, self.level, self.player, can_see)
 
     def trigger_bullet_behaviour(self):
         for bullet in self.level.bullets:
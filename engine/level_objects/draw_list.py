@@ -0,0 +1,79 @@
+from typing import Iterator, List, Optional
+
+import pygame
+
+from engine.entities.game_object import GameObject
+
+
+class DrawList:
+    """
+    Every game object in a level, enemies and bullets alike, in the order they should be drawn: furthest from the
+    camera first, so that nearer objects are drawn over further ones.
+
+    The list is kept between frames rather than rebuilt. Objects join and leave it as they're added to and removed from
+    their GameObjectGroup (e.g. when they're killed), and it's re-sorted each frame. Objects don't move far between
+    frames, so it's nearly sorted already, and python's sort (Timsort) only needs about one pass over a nearly sorted
+    list.
+    """
+
+    def __init__(self):
+        self._game_objs: List[GameObject] = []
+
+    def __len__(self) -> int:
+        return len(self._game_objs)
+
+    def __iter__(self) -> Iterator[GameObject]:
+        return iter(self._game_objs)
+
+    def sprites(self) -> List[GameObject]:
+        """
+        The objects in draw order, as a new list (like pygame.sprite.Group.sprites)
+        """
+        return list(self._game_objs)
+
+    def add(self, game_obj: GameObject):
+        self._game_objs.append(game_obj)
+
+    def remove(self, game_obj: GameObject):
+        self._game_objs.remove(game_obj)
+
+    def sort(self, distances: List[float]) -> List[int]:
+        """
+        Re-sort the list, furthest first.
+
+        :param distances: distance from the camera to each object, in the list's current order
+        :return: where each object in the new order was in the old order, to sort anything else kept in the old order
+            the same way
+        """
+        order = sorted(range(len(distances)), key=distances.__getitem__, reverse=True)
+        self._game_objs = [self._game_objs[i] for i in order]
+        return order
+
+
+class GameObjectGroup(pygame.sprite.Group):
+    """
+    A sprite group which also keeps its sprites in the level's DrawList, so that every kind of object can be drawn from
+    one depth sorted list while still being kept in separate groups for the game logic.
+    """
+
+    def __init__(self, *sprites):
+        self.draw_list: Optional[DrawList] = None
+        super(GameObjectGroup, self).__init__(*sprites)
+
+    def set_draw_list(self, draw_list: DrawList):
+        """
+        Start keeping this group's sprites, including the ones already in it, in the given draw list.
+        """
+        self.draw_list = draw_list
+        for sprite in self.sprites():
+            draw_list.add(sprite)
+
+    def add_internal(self, sprite, layer=None):
+        super(GameObjectGroup, self).add_internal(sprite, layer)
+        if self.draw_list is not None:
+            self.draw_list.add(sprite)
+
+    def remove_internal(self, sprite):
+        super(GameObjectGroup, self).remove_internal(sprite)
+        if self.draw_list is not None:
+            self.draw_list.remove(sprite)
@@ -1,13 +1,18 @@
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 import time
 
-import pygame
+import numpy as np
 
 from engine.entities.game_object import GameObject
 from engine.utils import math_utils
+from engine.asset_loaders.asset_cache import AssetSet
 from engine.entities.enemy import Enemy
+from engine.level_objects.draw_list import DrawList, GameObjectGroup
 from engine.level_objects.levelmap import LevelMap
+from engine.level_objects.line_of_sight_cache import LineOfSightCache
 from engine.surfaces.surface_map import SurfaceMap
+from engine.utils import raycast, vector_cast
+from engine.utils.raycast import RaycastHit, RaycastHits
 
 
 class Level:
@@ -15,16 +20,53 @@ class Level:
     Class for keeping track of an entire level, including the map and the enemies on it
     """
 
-    def __init__(self, level_map: LevelMap, wall_surface_map: SurfaceMap, enemies: pygame.sprite.Group, bullets: pygame.sprite.Group):
+    # How far from its location an enemy counts as occupying, for collisions and for rays hitting it
+    ENTITY_RADIUS = 0.5
+
+    def __init__(self, level_map: LevelMap, wall_surface_map: SurfaceMap, enemies: GameObjectGroup, bullets: GameObjectGroup,
+                 floor_surface_map: Optional[SurfaceMap] = None, floor_tile: Optional[int] = None,
+                 ceiling_tile: Optional[int] = None, assets: Optional[AssetSet] = None):
+        """
+        :param enemies: group of the enemies in the level, which are drawn from the level's draw list along with the
+            bullets
+        :param floor_surface_map: textures for the floor and ceiling, None to leave them untextured
+        :param floor_tile: tile of floor_surface_map for the floor (numbered as for walls), None for no floor texture
+        :param ceiling_tile: tile of floor_surface_map for the ceiling, None for no ceiling texture
+        :param assets: the shared textures the level holds, which anything else in the level (e.g. bullets) should get
+            its textures through too. A new set if not given.
+        """
         self.level_map = level_map
         self.enemies = enemies
         self.bullets = bullets
         self.wall_surface_map = wall_surface_map
+        self.floor_surface_map = floor_surface_map
+        self.floor_tile = floor_tile
+        self.ceiling_tile = ceiling_tile
+        self.assets = assets or AssetSet()
+
+        # every enemy and bullet, in the order to draw them
+        self.draw_list = DrawList()
+        self.enemies.set_draw_list(self.draw_list)
+        self.bullets.set_draw_list(self.draw_list)
+
+        # answers to lines_of_sight_to, kept until the map changes
+        self.line_of_sight_cache = LineOfSightCache(level_map)
+
+        # the map as an array of wall texture ids for casting batches of rays with numpy, built when first needed
+        self._wall_grid = None
+        self._wall_grid_version = None
 
         # Track level completion stats
         self._initial_enemy_count = len(enemies)
         self._level_start_time = time.time()
 
+    def release_assets(self):
+        """
+        Give back the level's textures to the asset cache, once the level is finished with. Load the next level first,
+        so that textures the two share stay loaded.
+        """
+        self.assets.release()
+
     def __del__(self):
         self.enemies.empty()
 
@@ -32,7 +74,7 @@ class Level:
         """
         Return True/False for if there is a wall at a given location.
         """
-        return self.level_map.get_symbol_at_map_xy(x, y) != ' '
+        return self.level_map.is_wall(x, y)
 
     def enemy_near_location(self, x: float, y: float, exclude_enemy: Optional[GameObject] = None) -> Optional[Enemy]:
         """
@@ -49,7 +91,7 @@ class Level:
         for enemy in self.enemies:
             if enemy == exclude_enemy:
                 continue
-            if math_utils.distance_formula(x, y, enemy.x, enemy.y) < 0.5:
+            if math_utils.distance_formula(x, y, enemy.x, enemy.y) < self.ENTITY_RADIUS:
                 return enemy
 
     def location_is_valid(self, x: float, y: float, exclude_enemy: Optional[GameObject] = None) -> bool:
@@ -66,60 +108,61 @@ class Level:
 
         return True
     
-    def line_of_sight_between_coords(self, x1: float, y1: float, x2: float, y2: float) -> bool:
+    def get_wall_grid(self) -> np.ndarray:
         """
-        Works out if there is line of sight (LOS) between two points. E.g. if an enemy can see the player
-        :return: 
+        The map as from vector_cast.build_wall_grid, rebuilt if the map has changed since it was last asked for
         """
-        # Todo: this is lifted pretty much straight from Raycaster. Possible to rationalize?
-        x_increasing = False
-        y_increasing = False
-
-        intercept = None  # y intercept, if this line is not vertical
-        gradient = None  # gradient of this line
-
-        # As long as this isn't a vertical line...
-        if x1 != x2:
-            gradient = math_utils.gradient(x1, y1, x2, y2)
-
-            x_increasing = x2 > x1
-
-            intercept = y1 - (gradient * x1)
+        if self._wall_grid is None or self._wall_grid_version != self.level_map.version:
+            self._wall_grid = vector_cast.build_wall_grid(self.level_map)
+            self._wall_grid_version = self.level_map.version
+        return self._wall_grid
 
-        # as long as this isn't a hotizontal line...
-        if y1 != y2:
-            y_increasing = y2 > y1
-
-        ray_x = x1
-        ray_y = y1
-
-        ray_x_whole = ray_x % 1 == 0
-        ray_y_whole = ray_y % 1 == 0
-
-        while math_utils.distance_formula(ray_x, ray_y, x2, y2) > 1:
-
-            x_poi_x, x_poi_y = math_utils.get_next_x_poi(x2, ray_x, gradient, intercept, x_increasing, ray_x_whole)
-            y_poi_x, y_poi_y = math_utils.get_next_y_poi(x2, y2, ray_y, gradient, intercept, y_increasing, ray_y_whole)
-            ray_x, ray_y = math_utils.get_closest_point(ray_x, ray_y, x_poi_x, x_poi_y, y_poi_x, y_poi_y)
+    def raycast(self, origin: Tuple[float, float], direction: Tuple[float, float], max_distance: float,
+                entities: Optional[Sequence[GameObject]] = None) -> RaycastHit:
+        """
+        Casts a ray from origin along direction, returning the wall it hits (cell, side and distance) and the first
+        entity it passes through before it. Everything which needs to know what's along a line (drawing the walls,
+        LOS, instant hit weapons) goes through this or raycast_many, see utils/raycast.py.
 
-            # the ray will be one of the identified POIs, so one of the x/y values will be whole
-            ray_x_whole = ray_x == x_poi_x
-            ray_y_whole = ray_y == y_poi_y
+        :param direction: (x, y) direction of the ray. Distances in the result are in multiples of its length.
+        :param max_distance: give up looking for a wall or an entity after travelling this far along the ray
+        :param entities: the entities the ray can hit, defaults to the enemies. Pass () for walls only.
+        """
+        if entities is None:
+            entities = self.enemies.sprites()
+        return raycast.query(self.level_map, origin, direction, max_distance, entities, self.ENTITY_RADIUS)
 
-            plot_x = ray_x
-            plot_y = ray_y
-            if ray_x_whole and not x_increasing:
-                plot_x = ray_x - 1
+    def raycast_many(self, origin: Tuple[float, float], dir_xs: np.ndarray, dir_ys: np.ndarray, max_distance: float,
+                     entities: Optional[Sequence[GameObject]] = None, vectorised: bool = True) -> RaycastHits:
+        """
+        Batched raycast: casts a ray from origin along each direction.
 
-            if ray_y_whole and not y_increasing:
-                plot_y = ray_y - 1
+        :param vectorised: walk all of the rays at once with numpy, rather than each in turn with the DDA
+        """
+        if entities is None:
+            entities = self.enemies.sprites()
+        wall_grid = self.get_wall_grid() if vectorised else None
+        return raycast.query_many(self.level_map, origin, dir_xs, dir_ys, max_distance, wall_grid, entities,
+                                  self.ENTITY_RADIUS)
 
-            map_symbol = self.level_map.get_symbol_at_map_xy(plot_x, plot_y)
+    def line_of_sight_between_coords(self, x1: float, y1: float, x2: float, y2: float) -> bool:
+        """
+        Works out if there is line of sight (LOS) between two points. E.g. if an enemy can see the player
+        :return: True if no wall is in the way
+        """
+        # the direction is the whole way from one point to the other, so a wall more than 1 along it is beyond (x2, y2)
+        return not self.raycast((x1, y1), (x2 - x1, y2 - y1), 1, entities=()).hit_wall
 
-            if map_symbol != ' ':  # Wall in between player and enemy
-                return False
+    def lines_of_sight_to(self, sources: Iterable[Tuple[float, float]], target_x: float, target_y: float) -> List[bool]:
+        """
+        Works out LOS from many points to one, e.g. from every enemy to the player, in one go. Unlike
+        line_of_sight_between_coords this is between the centres of the map squares the points are in, so that the
+        answers can be cached and shared by everything in the same square (see LineOfSightCache).
 
-        return True
+        :param sources: (x, y) of each point looking at the target
+        :return: True for each source which can see the target, in the same order
+        """
+        return self.line_of_sight_cache.check_many(sources, target_x, target_y)
 
     def is_complete(self) -> bool:
         """
@@ -1,14 +1,31 @@
 import math
 
+import numpy as np
+
 
 class LevelMap:
     """
     Data class for holding information directly related to the map for the present level.
+
+    The map is held as a 2d uint8 array of cell codes, indexed [y, x], rather than the map string it was loaded from, so
+    that lookups give ints which can be compared directly, and whole batches of coordinates can be looked up at once.
+    A wall's code is its texture id (the digit in the map string). EMPTY and BORDER are kept above any texture id, and
+    the codes between are free for other kinds of cell.
+
+    The array has a border one cell wide all the way round it of BORDER cells, so a lookup up to one cell off the map
+    (e.g. by a ray stepping a cell at a time) needs no bounds check. Lookups further off the map give BORDER too.
     """
 
     default_squares_x = 16
     default_squares_y = 16
 
+    # The code for a square with nothing in it
+    EMPTY = 255
+    # The code for anywhere off the map. Blocks movement like a wall, but isn't drawn.
+    BORDER = 254
+
+    EMPTY_SYMBOL = ' '
+
     def __init__(self,
                  map_str: str,
                  map_squares_x: int = default_squares_x,
@@ -16,17 +33,123 @@ class LevelMap:
                  ):
         """
         Sets up a level Map with a grid coordinate system for locating objects easily.
+
+        :raises ValueError: the map string has a symbol other than a space or a digit
         """
 
         assert (len(map_str) == map_squares_x * map_squares_y)
 
-        self.map_str = map_str
         self.map_squares_x = map_squares_x
         self.map_squares_y = map_squares_y
 
+        self.cells = np.full((map_squares_y + 2, map_squares_x + 2), self.BORDER, dtype=np.uint8)
+        self.cells[1:-1, 1:-1] = np.array([self.symbol_to_code(symbol) for symbol in map_str],
+                                          dtype=np.uint8).reshape(map_squares_y, map_squares_x)
+
+        # The same cells as a flat memoryview, for loops which look up one cell at a time: indexing it gives a python
+        # int, and is several times quicker than indexing the array. Cell x, y is at (y + 1) * stride + x + 1.
+        self.flat_cells = self.cells.reshape(-1).data
+        self.stride = map_squares_x + 2
+
+        # Incremented whenever the map changes, so anything derived from it (e.g. the raycaster's wall grid, or a
+        # reused frame) can tell it's out of date
+        self.version = 0
+
+    @classmethod
+    def symbol_to_code(cls, symbol: str) -> int:
+        """
+        The cell code for a symbol in a map string
+
+        :raises ValueError: the symbol isn't a space or a digit
+        """
+        if symbol == cls.EMPTY_SYMBOL:
+            return cls.EMPTY
+        if len(symbol) != 1 or not symbol.isdigit():
+            raise ValueError(f"Unknown map symbol: '{symbol}'")
+        return int(symbol)
+
+    @classmethod
+    def code_to_symbol(cls, code: int) -> str:
+        """
+        The map string symbol for a cell code. The border is shown as empty.
+        """
+        if code >= cls.BORDER:
+            return cls.EMPTY_SYMBOL
+        return str(code)
+
+    @property
+    def grid(self) -> np.ndarray:
+        """
+        The cells on the map, without the border, indexed [y, x]. This is a view, so don't write to it (see set_cell).
+        """
+        return self.cells[1:-1, 1:-1]
+
+    @property
+    def map_str(self) -> str:
+        """
+        The map as a map string, as it was loaded
+        """
+        return ''.join(self.code_to_symbol(code) for code in self.grid.reshape(-1).tolist())
+
+    def get_cell(self, x: float, y: float) -> int:
+        """
+        Get the cell code at a map coordinate, or BORDER if it's off the map
+        """
+        cell_x = math.floor(x)
+        cell_y = math.floor(y)
+        if 0 <= cell_x < self.map_squares_x and 0 <= cell_y < self.map_squares_y:
+            return self.flat_cells[(cell_y + 1) * self.stride + cell_x + 1]
+        return self.BORDER
+
+    def get_cells(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Get the cell codes at many map coordinates at once, BORDER for any off the map
+
+        :param xs: x of each coordinate
+        :param ys: y of each coordinate, the same shape as xs
+        :return: uint8 codes, the same shape as xs
+        """
+        cell_xs = np.clip(np.floor(xs), -1, self.map_squares_x).astype(np.intp) + 1
+        cell_ys = np.clip(np.floor(ys), -1, self.map_squares_y).astype(np.intp) + 1
+        return self.cells[cell_ys, cell_xs]
+
+    def is_wall(self, x: float, y: float) -> bool:
+        """
+        Whether a map coordinate is blocked, by a wall or by being off the map
+        """
+        cell_x = math.floor(x)
+        cell_y = math.floor(y)
+        if 0 <= cell_x < self.map_squares_x and 0 <= cell_y < self.map_squares_y:
+            return self.flat_cells[(cell_y + 1) * self.stride + cell_x + 1] != self.EMPTY
+        return True
+
+    def are_walls(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        Batched is_wall, see get_cells
+        """
+        return self.get_cells(xs, ys) != self.EMPTY
+
+    def set_cell(self, x: float, y: float, code: int):
+        """
+        Change the cell code at the map coordinate, e.g. to open a door or knock down a wall
+        """
+        cell_x = math.floor(x)
+        cell_y = math.floor(y)
+        assert 0 <= cell_x < self.map_squares_x and 0 <= cell_y < self.map_squares_y
+
+        self.cells[cell_y + 1, cell_x + 1] = code
+        self.version += 1
+
     def get_symbol_at_map_xy(self, x: float, y: float) -> str:
         """
         Get the map symbol at the map coordinate
         """
-        map_index = math.floor(x) + math.floor(y) * self.map_squares_x
-        return self.map_str[map_index]
+        return self.code_to_symbol(self.get_cell(x, y))
+
+    def set_symbol_at_map_xy(self, x: float, y: float, symbol: str):
+        """
+        Change the map symbol at the map coordinate, e.g. to open a door or knock down a wall
+        """
+        assert len(symbol) == 1
+
+        self.set_cell(x, y, self.symbol_to_code(symbol))
@@ -42,9 +42,10 @@ class LevelMapSurface:
         # We will be drawing some pixels over the surface
         px_map = pygame.PixelArray(self.surface)
 
+        grid = self.level_map.grid.tolist()
         for y in range(self.level_map.map_squares_y):
             for x in range(self.level_map.map_squares_x):
-                if self.level_map.map_str[x + y * self.level_map.map_squares_x] == ' ':
+                if grid[y][x] == LevelMap.EMPTY:
                     continue  # skip empty spaces
 
                 # Work out top left corner x, y and the bottom right x, y
@@ -0,0 +1,81 @@
+import math
+from typing import Dict, Iterable, List, Tuple
+
+from engine.level_objects.levelmap import LevelMap
+from engine.utils import raycast
+
+
+class LineOfSightCache:
+    """
+    Answers line of sight (LOS) between map squares, remembering each answer until the map changes.
+
+    LOS is worked out between the centres of the two squares, so it's the same for everything standing in the same
+    square, and enemies which haven't left their square since the last check (or are in a square another enemy has
+    just checked from) get the answer without tracing a ray. The cache is keyed by (source square, target square) and
+    emptied whenever the map's version changes, or if it grows past max_entries.
+    """
+
+    def __init__(self, level_map: LevelMap, max_entries: int = 65536):
+        self.level_map = level_map
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._results: Dict[Tuple[int, int, int, int], bool] = {}
+        self._version = level_map.version
+
+    def check_many(self, sources: Iterable[Tuple[float, float]], target_x: float, target_y: float) -> List[bool]:
+        """
+        Whether each of the source points has LOS to the target point.
+
+        :param sources: (x, y) of each source, e.g. each enemy
+        :return: True for each source which can see the target, in the same order
+        """
+        if self.level_map.version != self._version:
+            self._results.clear()
+            self._version = self.level_map.version
+
+        target_cell_x = math.floor(target_x)
+        target_cell_y = math.floor(target_y)
+
+        results = []
+        for source_x, source_y in sources:
+            key = (math.floor(source_x), math.floor(source_y), target_cell_x, target_cell_y)
+            result = self._results.get(key)
+            if result is None:
+                self.misses += 1
+                result = self._trace(*key)
+                if len(self._results) >= self.max_entries:
+                    self._results.clear()
+                self._results[key] = result
+            else:
+                self.hits += 1
+            results.append(result)
+        return results
+
+    def _trace(self, source_cell_x: int, source_cell_y: int, target_cell_x: int, target_cell_y: int) -> bool:
+        """
+        Whether a ray from the centre of the target square reaches the centre of the source square without hitting a
+        wall. The ray's direction is the whole way from one to the other, so its distances are fractions of the way
+        there and anything hit beyond 1 is past the source.
+        """
+        if (source_cell_x, source_cell_y) == (target_cell_x, target_cell_y):
+            return True
+
+        return not raycast.query(
+            self.level_map, (target_cell_x + 0.5, target_cell_y + 0.5),
+            (source_cell_x - target_cell_x, source_cell_y - target_cell_y), 1
+        ).hit_wall
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._results),
+        }
@@ -1,23 +1,131 @@
 import math
-import array
+from typing import Optional
+from timeit import default_timer as timer
 
+import numpy as np
 import pygame
 from pygame import Rect
 
 from engine.entities.game_object import GameObject
 from engine.level_objects.level import Level
 from engine.level_objects.levelmapsurface import LevelMapSurface
-from engine.utils import math_utils
+from engine.rendering.blit_wall_renderer import BlitWallRenderer
+from engine.rendering.floor_caster import FloorCaster
+from engine.rendering.ray_hit_buffer import RayHitBuffer
+from engine.rendering.striped_renderer import StripedRenderer
+from engine.rendering.wall_rasterizer import WallRasterizer, build_texture_array, map_texture_array
+from engine.utils import math_utils, vector_cast
 
 
 class RayCaster:
 
-    DRAW_DISTANCE = 16
+    # How far (in map squares) rays travel looking for a wall before giving up. Game objects further away than this
+    # aren't drawn either.
+    DRAW_DISTANCE = 24
+
+    # Game objects closer to the camera than this aren't drawn, e.g. a bullet on the frame it's fired
+    NEAR_PLANE = 0.01
+
+    # Available implementations of cast(). The loop backend walks each ray in turn in python, the numpy backend walks
+    # all of the rays for the frame at once as arrays.
+    LOOP_BACKEND = 'loop'
+    NUMPY_BACKEND = 'numpy'
+    BACKENDS = (LOOP_BACKEND, NUMPY_BACKEND)
+
+    # Available ways of drawing the walls once the rays are cast. The blit renderer scales and blits a texture slice
+    # per column, the surfarray renderer writes all the columns into the surface's pixels in one go with numpy.
+    BLIT_RENDERER = 'blit'
+    SURFARRAY_RENDERER = 'surfarray'
+    WALL_RENDERERS = (BLIT_RENDERER, SURFARRAY_RENDERER)
+
+    def __init__(self, display_surface: pygame.Surface, level: Level, fov: float, dev_mode: bool = False,
+                 backend: str = LOOP_BACKEND, wall_renderer: str = BLIT_RENDERER, render_workers: int = 0,
+                 render_scale: float = 1.0, frame_reuse: bool = False, column_reuse: bool = False):
+        """
+        :param render_workers: if more than 0, the walls are cast and rasterized by this many worker processes, each
+            doing a vertical stripe of the screen (see StripedRenderer). The backend and wall renderer are then only
+            used if the workers aren't available.
+        :param render_scale: proportion of the display's resolution to render at. Below 1 the scene is rendered into a
+            smaller offscreen surface, which present() scales up to fill the display.
+        :param frame_reuse: keep a copy of the last frame, and redraw it rather than rendering it again if nothing in
+            view has changed since
+        :param column_reuse: when the camera only turns, reuse the rays from the last frame which are still on screen
+            and only cast the new ones. The camera angle is snapped to whole columns for this.
+        """
+
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown raycaster backend '{backend}'")
+        if wall_renderer not in self.WALL_RENDERERS:
+            raise ValueError(f"Unknown wall renderer '{wall_renderer}'")
+        if render_workers < 0:
+            raise ValueError("render_workers must not be negative")
+        if not 0 < render_scale <= 1:
+            raise ValueError("render_scale must be greater than 0 and at most 1")
 
-    def __init__(self, display_surface: pygame.Surface, level: Level, fov: float, dev_mode: bool = False):
         self.temp_counter = 0
-        self.display_surface = display_surface
         self.current_level = level
+        self.dev_mode = dev_mode
+        self.backend = backend
+        self.render_workers = render_workers
+        self.render_scale = render_scale
+        self.frame_reuse = frame_reuse
+        self.column_reuse = column_reuse
+
+        # Number of frames where the walls, or the walls and the sprites, were copied from the previous frame rather
+        # than rendered
+        self.reused_wall_count = 0
+        self.reused_frame_count = 0
+
+        # Number of columns where the ray was reused from the previous frame rather than cast
+        self.reused_column_count = 0
+
+        # Number of game objects skipped for being behind the camera, outside the fov or too far away, and the number
+        # left to draw, last frame
+        self.culled_object_count = 0
+        self.drawn_object_count = 0
+
+        # The numpy backend (and the render workers) look walls up in an array version of the map, which the level
+        # keeps (see Level.get_wall_grid)
+        self.wall_grid = None
+        self._wall_grid_version = self.current_level.level_map.version
+        if self.backend == self.NUMPY_BACKEND or self.render_workers:
+            self.wall_grid = self.current_level.get_wall_grid()
+
+        # draws the walls from the ray hit buffer
+        if wall_renderer == self.SURFARRAY_RENDERER:
+            self.wall_renderer = WallRasterizer(build_texture_array(self.current_level.wall_surface_map))
+        else:
+            self.wall_renderer = BlitWallRenderer(self.current_level.wall_surface_map)
+
+        # textures the floor and ceiling, if the level has textures for them
+        self.floor_caster = None
+        if self.current_level.floor_surface_map:
+            self.floor_caster = FloorCaster(build_texture_array(self.current_level.floor_surface_map),
+                                            self.current_level.floor_tile, self.current_level.ceiling_tile)
+
+        # how long drawing the floor and ceiling took last frame, in seconds
+        self.floor_time = 0.0
+
+        # everything which depends on the size of the screen and the fov is set up in set_view
+        self.striped_renderer = None
+        self.set_view(display_surface, fov)
+
+    def set_view(self, display_surface: pygame.Surface, fov: float):
+        """
+        Sets up everything which depends on the surface being drawn to and the field of view, including the per-column
+        camera tables. Called on init, and should be called again if the resolution or the fov changes.
+        """
+        # The surface the finished frame ends up on. Everything below is worked out from the surface we actually
+        # render to, which is a smaller offscreen one if there's a render scale, so that the rays, the walls and the
+        # sprites are all projected at the internal resolution.
+        self.output_surface = display_surface
+        if self.render_scale < 1:
+            render_size = (max(1, round(display_surface.get_width() * self.render_scale)),
+                           max(1, round(display_surface.get_height() * self.render_scale)))
+            # same pixel format as the display, so the upscale in present() doesn't need to convert
+            display_surface = pygame.Surface(render_size, 0, display_surface)
+
+        self.display_surface = display_surface
         self.win_w = display_surface.get_width()
         self.half_win_w = self.win_w / 2
         self.win_h = display_surface.get_height()
@@ -25,7 +133,6 @@ class RayCaster:
 
         self.fov = fov
         self.half_fov = self.fov / 2
-        self.dev_mode = dev_mode
 
         self.max_obj_size_on_screen = self.win_h * 2
 
@@ -35,7 +142,7 @@ class RayCaster:
         self.render_area_width = self.win_w
         self.render_area_start = 0
 
-        if dev_mode:
+        if self.dev_mode:
             # In dev mode set up the map to appear on the left half of the screen
             self.render_area_width = math.floor(self.win_w / 2)
 
@@ -49,151 +156,345 @@ class RayCaster:
 
         self.half_render_area_width = math.floor(self.render_area_width / 2)
 
-        # Initialize the depth map to an int array of size of the render area width
-        self.depth_map = array.array('f', [999]*self.win_w)
+        # What each column's ray hit, filled in by cast. The depth map the sprites are checked against is the distance
+        # along each column's ray, indexed from the start of the render area.
+        self.ray_hits = RayHitBuffer(self.render_area_width)
+        self.depth_map = self.ray_hits.distance
+
+        self._build_camera_tables()
+
+        # Where the camera was when the ray hit buffer was filled, for column reuse, see _cast_columns
+        self._previous_camera = None
+
+        if self.render_workers:
+            self._start_striped_renderer()
+
+        # Copies of the last frame for frame reuse, with just the walls and with the sprites as well, along with the
+        # keys (see cast and render_game_objects) they were rendered for
+        self._wall_layer = None
+        self._frame_layer = None
+        self._wall_key = None
+        self._frame_key = None
+        self._walls_reused = False
+        if self.frame_reuse:
+            self._wall_layer = pygame.Surface(self.display_surface.get_size(), 0, self.display_surface)
+            self._frame_layer = pygame.Surface(self.display_surface.get_size(), 0, self.display_surface)
+
+    def present(self):
+        """
+        Copies the frame to the output surface, scaling it up if rendering at a lower resolution, then clears the
+        offscreen surface for the next frame. Does nothing when rendering straight to the output surface. Call after
+        drawing the scene and before drawing anything which should stay at native resolution, like the HUD.
+        """
+        if self.display_surface is self.output_surface:
+            return
+
+        pygame.transform.scale(self.display_surface, self.output_surface.get_size(), self.output_surface)
+        self.display_surface.fill((0, 0, 0))
+
+    def close(self):
+        """
+        Stops any render worker processes. The raycaster can't be used after this.
+        """
+        if self.striped_renderer:
+            self.striped_renderer.close()
+            self.striped_renderer = None
+
+    def _start_striped_renderer(self):
+        """
+        (Re)starts the render workers with the current camera tables and the pixel format of the display surface. If
+        they can't be started, rendering falls back to the backend and wall renderer in this process.
+        """
+        self.close()
+
+        textures = map_texture_array(build_texture_array(self.current_level.wall_surface_map), self.display_surface)
+        try:
+            self.striped_renderer = StripedRenderer(
+                self.render_workers,
+                self.wall_grid,
+                textures,
+                self.camera_dir_x,
+                self.camera_dir_y,
+                self.fisheye_correction,
+                self.win_h,
+                self.DRAW_DISTANCE
+            )
+        except OSError as e:
+            # e.g. no shared memory, or processes can't be started here. The backend and wall renderer draw the walls.
+            print(f"Not using render workers, rendering in a single process: {e}")
+            self.striped_renderer = None
+
+    def _build_camera_tables(self):
+        """
+        The angle of each column's ray relative to where the player is facing only depends on the fov and the width of
+        the render area, so rather than working out the angle, its cos/sin and the fisheye correction for every column
+        on every frame, we work them out once here. Each frame then only has to rotate the directions by the player's
+        angle.
+        """
+        columns = np.arange(self.render_area_width)
+
+        # angle of each column's ray away from the centre line of the player's vision
+        self.ray_angle_offsets = -self.half_fov + (self.fov * columns) / self.render_area_width
+
+        # direction of each column's ray when the player is facing along the x axis
+        self.camera_dir_x = np.cos(self.ray_angle_offsets)
+        self.camera_dir_y = np.sin(self.ray_angle_offsets)
+
+        # if we're looking straight at a wall, the col_h is the win_h / distance. To correct fisheye distortion we
+        # multiply the distance by cos of the angle of the column away from the centre line, which is a proportion of
+        # the distance if we were looking straight at it. This happens to be the x component of the camera direction.
+        self.fisheye_correction = self.camera_dir_x
+
+        # the rays of neighbouring columns are this far apart
+        self.column_angle_step = self.fov / self.render_area_width
+
+    def _get_ray_directions(self, angle_from_x_axis: float):
+        """
+        Rotates the camera directions from the tables by the player angle to get the direction of each column's ray
+        in the world.
+
+        :return: x components, y components as numpy arrays
+        """
+        cos_angle = math.cos(angle_from_x_axis)
+        sin_angle = math.sin(angle_from_x_axis)
+        dir_x = self.camera_dir_x * cos_angle - self.camera_dir_y * sin_angle
+        dir_y = self.camera_dir_x * sin_angle + self.camera_dir_y * cos_angle
+        return dir_x, dir_y
 
     def cast(self, origin_x: float, origin_y: float, angle_from_x_axis:float):
         """
         Raycasts onto self.display_surface based on the location and angle given, and self.current_map
+
+        Casting the rays is done by the selected backend, which gives us per-column results. The walls are then drawn
+        from those results by the selected wall renderer.
+
+        With frame reuse on, the walls only depend on where the camera is and the map, so if neither has changed
+        since the last frame the walls from that frame are copied back and the depth map is left as it is.
+        """
+        level_map = self.current_level.level_map
+        if level_map.version != self._wall_grid_version:
+            self._update_wall_grid()
+
+        angle_from_x_axis = self._snap_angle(angle_from_x_axis)
+
+        wall_key = (origin_x, origin_y, angle_from_x_axis, level_map.version)
+        self._walls_reused = self.frame_reuse and wall_key == self._wall_key
+        if self._walls_reused:
+            self.display_surface.blit(self._wall_layer, (0, 0))
+            self.reused_wall_count += 1
+            self.floor_time = 0.0
+            return
+
+        self._cast_walls(origin_x, origin_y, angle_from_x_axis)
+
+        if self.frame_reuse:
+            self._wall_layer.blit(self.display_surface, (0, 0))
+            self._wall_key = wall_key
+
+    def _snap_angle(self, angle_from_x_axis: float) -> float:
+        """
+        With column reuse on, rounds the camera angle to a whole number of columns' worth of rotation, so that after
+        any turn the new rays line up exactly with rays from the last frame. A column is a fraction of a degree, so
+        this can't be seen.
+        """
+        if not self.column_reuse:
+            return angle_from_x_axis
+        return round(angle_from_x_axis / self.column_angle_step) * self.column_angle_step
+
+    def _update_wall_grid(self):
         """
+        Rebuilds the array version of the map after the map has changed.
+        """
+        level_map = self.current_level.level_map
+        if self.wall_grid is not None:
+            self.wall_grid = self.current_level.get_wall_grid()
+            if self.striped_renderer:
+                self.striped_renderer.update_wall_grid(self.wall_grid)
+        self._wall_grid_version = level_map.version
+        self._previous_camera = None
+
+    def _cast_walls(self, origin_x: float, origin_y: float, angle_from_x_axis: float):
+        """
+        Casts the rays into the ray hit buffer, then has the wall renderer draw the walls from it.
+        """
+        dir_xs, dir_ys = self._get_ray_directions(angle_from_x_axis)
+
+        striped_hits = None
+        if self.striped_renderer:
+            # the workers draw the walls over what's on the screen, so the floor has to go first
+            self._draw_floor(origin_x, origin_y, dir_xs, dir_ys)
+
+            # the workers cast the rays and draw the walls, we just keep what they hit
+            try:
+                striped_hits = self.striped_renderer.render(
+                    self.display_surface, self.render_area_start, origin_x, origin_y, angle_from_x_axis
+                )
+            except (EOFError, OSError) as e:
+                # a worker has died, and the renderer has stopped the rest. Carry on in this process, as when the
+                # workers can't be started.
+                print(f"Render workers stopped, rendering in a single process: {e!r}")
+                self.striped_renderer = None
+
+        if striped_hits is not None:
+            self.ray_hits.set_hits(slice(None), *striped_hits)
+        elif self.column_reuse:
+            self._cast_columns(origin_x, origin_y, angle_from_x_axis, dir_xs, dir_ys)
+        else:
+            self.ray_hits.set_hits(slice(None), *self._cast_rays(origin_x, origin_y, dir_xs, dir_ys))
+
+        # the column heights are corrected for fisheye distortion, see _build_camera_tables
+        self.ray_hits.project(origin_x, origin_y, dir_xs, dir_ys, self.fisheye_correction, self.win_h)
 
         if self.dev_mode:
-            self.map_surface.draw_map_to_surface()
-            # add the player_objects to the map
-            px_x, px_y = self.map_surface.get_pixel_xy_from_map_xy(origin_x, origin_y)
-            self.display_surface.set_at((px_x, px_y), (100, 255, 0))
-
-        # for every pixel in the window width
-        for i in range(self.render_area_width):
-
-            # pixel x on the screen we are going to render on this iteration, same as i except in dev mode
-            screen_px_x = i
-
-            # The angle of the ray is calculated around the center point which is where the player_objects is facing
-            angle = angle_from_x_axis - self.half_fov + (self.fov * i) / self.win_w
-
-            if self.dev_mode:  # in dev mode we render the map on the left
-                screen_px_x += self.render_area_start
-                angle = angle_from_x_axis - self.half_fov + (self.fov * i) / (self.win_w / 2)
-
-            cos_angle = math.cos(angle)
-            sin_angle = math.sin(angle)
-
-            ray_x = origin_x + 0.05 * cos_angle
-            ray_y = origin_y + 0.05 * sin_angle
-
-            # what I want to do is calculate the next point(s) of interest (POI) on the graph, which are where the ray
-            # would cross into another map square. To do this, I need to figure out the direction of travel of the ray,
-            # e.g. weather we are going up/down the x and y axis
-            # I also need to solve the linear equation for the ray. With this info, we can calculate
-            # where the ray will cross into the next map squares (i.e. hit the next whole x and whole y numbers).
-            # with those coordinates known, we figure out which is closest and whether or not we hit a wall, then
-            # keep figuring out the next POI until we do hit a wall or we hit the draw distance
-
-            x_increasing = False
-            y_increasing = False
-
-            intercept = None  # y intercept, if this line is not vertical
-            gradient = None  # gradient of this line
-
-            # Work out the gradient + intercept (as long as not a vertical line) and whether the x and y values
-            # are increasing relative to the player_objects
-            if ray_x != origin_x:
-                gradient = math_utils.gradient(origin_x, origin_y, ray_x, ray_y)
-                x_increasing = ray_x > origin_x
-
-                # y intercept
-                intercept = origin_y - (gradient * origin_x)
-
-            # check for horizontal lines
-            if ray_y != origin_y:
-                y_increasing = ray_y > origin_y
-
-            # It's very unlikely that the first points we've chosen are whole, but they might be.
-            ray_x_whole = ray_x % 1 == 0
-            ray_y_whole = ray_y % 1 == 0
-
-            counter = 0
-            while counter < self.DRAW_DISTANCE:
-                # Anything that happens in here will be called a *lot*.
-
-                x_poi_x, x_poi_y = math_utils.get_next_x_poi(origin_x, ray_x, gradient, intercept, x_increasing, ray_x_whole)
-                y_poi_x, y_poi_y = math_utils.get_next_y_poi(origin_x, origin_y, ray_y, gradient, intercept, y_increasing, ray_y_whole)
-                ray_x, ray_y = math_utils.get_closest_point(ray_x, ray_y, x_poi_x, x_poi_y, y_poi_x, y_poi_y)
-
-                # the ray will be one of the identified POIs, so one of the x/y values will be whole
-                ray_x_whole = ray_x == x_poi_x
-                ray_y_whole = ray_y == y_poi_y
-
-                # draw visibility cone on map
-                if self.dev_mode:
-                    px_x, px_y = self.map_surface.get_pixel_xy_from_map_xy(ray_x, ray_y)
-                    self.display_surface.set_at((px_x, px_y), (255, 100, 0))
-
-                # If the Ray is at a whole number on the x/y grid, and is decreasing on that axis, the next wall it hits
-                # will actually be in the map square 1 over from the ray. I.e. if we're at square 2,1 and looking
-                # leftwards on the map, we need to render the wall at 1,1, not the lack of wall at 2,1.
-                plot_x = ray_x
-                plot_y = ray_y
-                if ray_x_whole and not x_increasing:
-                    plot_x = ray_x - 1
-
-                if ray_y_whole and not y_increasing:
-                    plot_y = ray_y - 1
-
-                map_symbol = self.current_level.level_map.get_symbol_at_map_xy(plot_x, plot_y)
-
-                # hit a wall
-                if map_symbol != " ":
-                    # if we're looking straight at the wall, the col_h is the win_h / distance. To correct fisheye
-                    # distortion we get the angle of the current col away from the centre line of the player_objects's vision
-                    # (angle - the player_objects angle). cos of that angle is a proportion of the height if we were looking
-                    # straight at it.
-                    ray_dist = math_utils.distance_formula(origin_x, origin_y, ray_x, ray_y)
-                    column_height = math.floor(self.win_h / (ray_dist * math.cos(angle - angle_from_x_axis)))
-                    column_start_y = math.floor(self.half_win_h - (column_height / 2))
-
-                    self.depth_map[screen_px_x] = ray_dist
-
-                    # The ray's location when it stopped will be a map square with a fraction. E.g. 3.456
-                    # If we home in on the fractional part of the value, we have a fraction which expresses how far
-                    # along the map square we are. Since the wall texture tiles are mapped 1:1 with map squares, we
-                    # can use this fraction to figure out the horizontal slice of the texture to get.
-                    # However, when rendering a 'vertical' wall (top down perspective), x will be ~0, and y will be used
-                    hit_x, _ = math.modf(ray_x)
-                    hit_y, _ = math.modf(ray_y)
-                    if math.fabs(hit_y) > math.fabs(hit_x):
-                        hit_x_coord = hit_y * self.current_level.wall_surface_map.tile_size
-                    else:
-                        hit_x_coord = hit_x * self.current_level.wall_surface_map.tile_size
-
-                    if hit_x_coord < 0:
-                        hit_x_coord = math.fabs(hit_x_coord)
-
-                    tile_slice = self.current_level.wall_surface_map.get_tile_slice(int(map_symbol), 0, int(hit_x_coord), column_height)
-
-                    self.display_surface.blit(tile_slice, (screen_px_x, column_start_y))
-
-                    break
-                counter += 1
+            self._draw_map(origin_x, origin_y)
+
+        if not self.striped_renderer:
+            # with the walls cast, rows of floor which are behind a wall all the way across can be skipped
+            self._draw_floor(origin_x, origin_y, dir_xs, dir_ys, self.ray_hits.column_height)
+            self.wall_renderer.draw(self.display_surface, self.render_area_start, self.ray_hits)
+
+    def _draw_floor(self, origin_x: float, origin_y: float, dir_xs: np.ndarray, dir_ys: np.ndarray,
+                    column_heights: Optional[np.ndarray] = None):
+        """
+        Draws the floor and ceiling with the floor caster, if there is one, timing it separately from the walls.
+        """
+        if not self.floor_caster:
+            return
+
+        start = timer()
+        self.floor_caster.draw(self.display_surface, self.render_area_start, origin_x, origin_y, dir_xs, dir_ys,
+                               self.fisheye_correction, column_heights)
+        self.floor_time = timer() - start
+
+    def _cast_rays(self, origin_x: float, origin_y: float, dir_xs: np.ndarray, dir_ys: np.ndarray) -> tuple:
+        """
+        Casts a batch of rays with the level's raycast, walking them all at once with numpy for the numpy backend, or
+        each in turn with the DDA for the loop backend. Only the walls are needed, so the rays don't look for entities.
+
+        :return: (distance, cell_x, cell_y, side, texture_id, tex_u) arrays, as from vector_cast.cast_rays
+        """
+        hits = self.current_level.raycast_many((origin_x, origin_y), dir_xs, dir_ys, self.DRAW_DISTANCE, entities=(),
+                                               vectorised=self.backend == self.NUMPY_BACKEND)
+        return hits.walls()
+
+    def _cast_columns(self, origin_x: float, origin_y: float, angle_from_x_axis: float, dir_xs: np.ndarray,
+                      dir_ys: np.ndarray):
+        """
+        Casts the rays for every column into the ray hit buffer, reusing last frame's results where possible.
+
+        The results are kept by the ray's angle in the world rather than by screen column. Columns are evenly spaced in
+        angle and the camera angle is snapped to whole columns, so when the camera has only turned since last frame,
+        turning by n columns means column i now shows exactly the ray column i + n showed before. The buffer is shifted
+        along by n, and only the n columns that have just come into view at one side are cast. The distances kept are
+        along the ray, so the fisheye correction for the column each ray is now in is applied afterwards, as normal.
+        """
+        columns = self.render_area_width
+        angle_index = round(angle_from_x_axis / self.column_angle_step)
+
+        shift = None
+        if self._previous_camera is not None and self._previous_camera[0] == (origin_x, origin_y):
+            shift = angle_index - self._previous_camera[1]
+
+        if shift is None or abs(shift) >= columns:
+            self.ray_hits.set_hits(slice(None), *self._cast_rays(origin_x, origin_y, dir_xs, dir_ys))
+        else:
+            self.ray_hits.shift(shift)
+
+            # the columns which have just come into view
+            new = slice(columns - shift, columns) if shift >= 0 else slice(0, -shift)
+            self.ray_hits.set_hits(new, *self._cast_rays(origin_x, origin_y, dir_xs[new], dir_ys[new]))
+
+            self.reused_column_count += columns - abs(shift)
+
+        self._previous_camera = ((origin_x, origin_y), angle_index)
+
+    def _draw_map(self, origin_x: float, origin_y: float):
+        """
+        Dev mode: draws the map, the player and the points where each ray hit a wall (the visibility cone) on the left
+        of the screen.
+        """
+        self.map_surface.draw_map_to_surface()
+
+        # add the player_objects to the map
+        px_x, px_y = self.map_surface.get_pixel_xy_from_map_xy(origin_x, origin_y)
+        self.display_surface.set_at((px_x, px_y), (100, 255, 0))
+
+        hit = self.ray_hits.texture_id != vector_cast.EMPTY_CELL
+        for hit_x, hit_y in zip(self.ray_hits.hit_x[hit].tolist(), self.ray_hits.hit_y[hit].tolist()):
+            px_x, px_y = self.map_surface.get_pixel_xy_from_map_xy(hit_x, hit_y)
+            self.display_surface.set_at((px_x, px_y), (255, 100, 0))
 
     def render_game_objects(self, origin_x: float, origin_y: float, angle_from_x_axis: float):
         """
         Function for drawing game objects (e.g. enemies, furniture). Loops through objects and draws them on the screen
         if visible to the player_objects.
-        """
-
-        # We will need to sort the objects by distance from the player_objects, so that we don't draw further away enemies over
-        # closer ones
-        obj_dist = lambda o: math_utils.distance_formula(origin_x, origin_y, o.x, o.y)
 
-        enemies = self.current_level.enemies.sprites()
-        for enemy in sorted(enemies, key=obj_dist, reverse=True):
-            self.draw_game_object(enemy, origin_x, origin_y, angle_from_x_axis)
+        With frame reuse on, if the walls were reused this frame and every object on screen is where it was last frame
+        and showing the same animation tile, the whole of the last frame is copied back instead.
+        """
 
-        bullets = self.current_level.bullets.sprites()
-        for bullet in sorted(bullets, key=obj_dist, reverse=True):
-            self.draw_game_object(bullet, origin_x, origin_y, angle_from_x_axis)
+        # the same angle the walls were cast at
+        angle_from_x_axis = self._snap_angle(angle_from_x_axis)
+
+        draw_list = self.current_level.draw_list
+        game_objs = draw_list.sprites()
+        obj_count = len(game_objs)
+
+        # Work out the angle and distance to every object at once, and cull those that can't be on screen before
+        # projecting the rest.
+        xs = np.fromiter((game_obj.x for game_obj in game_objs), dtype=float, count=obj_count)
+        ys = np.fromiter((game_obj.y for game_obj in game_objs), dtype=float, count=obj_count)
+        dxs = xs - origin_x
+        dys = ys - origin_y
+        obj_dists = np.hypot(dxs, dys)
+        relative_angles = (np.arctan2(dys, dxs) - angle_from_x_axis + math.pi) % math.tau - math.pi
+
+        # An object is on screen if its centre is within half its width of the edge of the render area. Anything
+        # behind the camera is well outside the fov, so that's culled too.
+        with np.errstate(divide='ignore'):
+            half_obj_sizes = np.minimum(self.max_obj_size_on_screen, self.win_h / obj_dists) / 2
+        on_screen = (np.abs(relative_angles) / self.fov * self.render_area_width
+                     <= self.half_render_area_width + half_obj_sizes + 1)
+        in_view = on_screen & (obj_dists >= self.NEAR_PLANE) & (obj_dists <= self.DRAW_DISTANCE)
+
+        # Draw furthest first, so that further away objects don't get drawn over closer ones. The draw list is nearly
+        # in order already from last frame, so sorting the whole of it costs little more than sorting what's in view.
+        order = draw_list.sort(obj_dists.tolist())
+        in_view = in_view.tolist()
+        draw_order = [i for i in order if in_view[i]]
+
+        self.drawn_object_count = len(draw_order)
+        self.culled_object_count = obj_count - self.drawn_object_count
+
+        relative_angles = relative_angles.tolist()
+        obj_dists = obj_dists.tolist()
+        projections = [
+            (game_objs[i], self._project(relative_angles[i], obj_dists[i]))
+            for i in draw_order
+        ]
+        if self.dev_mode:
+            # culled objects still show on the dev map
+            projections += [(game_objs[i], None) for i in order if not in_view[i]]
+
+        frame_key = None
+        if self.frame_reuse:
+            # objects off the screen can't change what's drawn, except on the dev map where they all appear
+            frame_key = (self._wall_key, tuple(
+                (game_obj, game_obj.x, game_obj.y, game_obj.get_display_tile())
+                for game_obj, projection in projections
+                if projection or self.dev_mode
+            ))
+            if self._walls_reused and frame_key == self._frame_key:
+                self.display_surface.blit(self._frame_layer, (0, 0))
+                self.reused_frame_count += 1
+                return
+
+        for game_obj, projection in projections:
+            self._draw_projected_game_object(game_obj, projection)
+
+        if self.frame_reuse:
+            self._frame_layer.blit(self.display_surface, (0, 0))
+            self._frame_key = frame_key
 
     def draw_game_object(self, game_obj: GameObject, origin_x: float, origin_y: float, angle_from_x_axis: float):
         """
@@ -202,6 +503,16 @@ class RayCaster:
         :param origin_y: y location of the camera (player_objects)
         :param angle_from_x_axis:
         """
+        projection = self._project_game_object(game_obj, origin_x, origin_y, angle_from_x_axis)
+        self._draw_projected_game_object(game_obj, projection)
+
+    def _project_game_object(self, game_obj: GameObject, origin_x: float, origin_y: float, angle_from_x_axis: float):
+        """
+        Works out where on the screen a game object would be drawn and how big, without drawing anything.
+
+        :return: (distance, unclamped size, size on screen, top left x, top left y), or None if the object is entirely
+            off the side of the screen
+        """
         # absolute direction from the player_objects to the sprite (in radians)
         obj_dir = math.atan2(game_obj.y - origin_y, game_obj.x - origin_x)
 
@@ -213,17 +524,18 @@ class RayCaster:
 
         obj_dist = math_utils.distance_formula(origin_x, origin_y, game_obj.x, game_obj.y)
 
-        if self.dev_mode:
-            # add the obj
-            px_x, px_y = self.map_surface.get_pixel_xy_from_map_xy(game_obj.x, game_obj.y)
-            self.display_surface.set_at((px_x, px_y), (255, 0, 0))
+        return self._project(obj_dir - angle_from_x_axis, obj_dist)
 
+    def _project(self, relative_angle: float, obj_dist: float):
+        """
+        Works out where on the screen an object would be drawn and how big, from its angle away from the centre line and
+        its distance, as _project_game_object returns it.
+        """
         calculated_obj_size = int(self.win_h / obj_dist)
         obj_size_on_screen = min(self.max_obj_size_on_screen, calculated_obj_size)
-        obj_scale = game_obj.surface_map.tile_size / obj_size_on_screen
         half_obj_size = math.floor(obj_size_on_screen / 2)
 
-        obj_center_as_ratio_of_fov = (obj_dir - angle_from_x_axis) / self.fov
+        obj_center_as_ratio_of_fov = relative_angle / self.fov
 
         # Note that the multiply here is a proportion of the screen, we then add half the render area width to center
         # it around the center of the screen rather than starting at 0
@@ -233,30 +545,72 @@ class RayCaster:
         top_left_y = math.floor(self.half_win_h - half_obj_size)
 
         if (top_left_x + obj_size_on_screen) < self.render_area_start:
-            return  # object is entirely to the left of the screen
-
-        # Fetch the tile object to draw:
-        display_tile = game_obj.get_display_tile()
-
-        for slice_x_offset in range(obj_size_on_screen):
-            x_on_screen = slice_x_offset + top_left_x
+            return None  # object is entirely to the left of the screen
 
-            if x_on_screen < self.render_area_start:
-                continue  # not yet on screen
+        if top_left_x > self.win_w:
+            return None  # object is entirely to the right of the screen
 
-            if x_on_screen > self.win_w:
-                break  # off the edge of the screen
+        return obj_dist, calculated_obj_size, obj_size_on_screen, top_left_x, top_left_y
 
-            if obj_dist > self.depth_map[x_on_screen-1]:
-                continue  # object is behind a wall
-
-            tile_slice_x = math.floor(slice_x_offset * obj_scale)
-
-            # Fetch the vertical slice of the active texture tile. The active tile will change each animation frame
-            # for animated objects, and will stay static for static objects.
-            tile_slice = display_tile.get_scaled_slice_at_x(tile_slice_x, calculated_obj_size)
+    def _draw_projected_game_object(self, game_obj: GameObject, projection):
+        """
+        Draws a game object at the position worked out by _project_game_object.
+        """
+        if self.dev_mode:
+            # add the obj
+            px_x, px_y = self.map_surface.get_pixel_xy_from_map_xy(game_obj.x, game_obj.y)
+            self.display_surface.set_at((px_x, px_y), (255, 0, 0))
 
+        if projection is None:
+            return  # off the screen
+
+        obj_dist, calculated_obj_size, obj_size_on_screen, top_left_x, top_left_y = projection
+
+        # the part of the object which is on the screen
+        visible_left = max(top_left_x, self.render_area_start)
+        visible_right = min(top_left_x + obj_size_on_screen, self.win_w)
+        visible_top = max(top_left_y, 0)
+        visible_bottom = min(top_left_y + obj_size_on_screen, self.win_h)
+        if visible_left >= visible_right or visible_top >= visible_bottom:
+            return
+
+        # runs of screen columns where the object is in front of the walls
+        runs = self.ray_hits.visible_runs(visible_left - self.render_area_start,
+                                          visible_right - self.render_area_start, obj_dist)
+        if not runs:
+            return  # object is behind a wall
+        if self.render_area_start:
+            runs = [(run_start + self.render_area_start, run_end + self.render_area_start)
+                    for run_start, run_end in runs]
+
+        # Fetch the tile object to draw. The active tile will change each animation frame for animated objects, and
+        # will stay static for static objects. With mipmaps, this scales from the smallest mip level which is still
+        # bigger than the object on screen.
+        display_tile = game_obj.get_display_tile()
+        tile_surface = display_tile.get_mip_surface(obj_size_on_screen)
+        tile_size = tile_surface.get_width()
+        obj_scale = obj_size_on_screen / tile_size
+
+        # Scale just the texels which are at least partly on screen, once for the whole object, and work out where the
+        # scaled texels go so they line up with where they would be if the whole object had been scaled.
+        first_tex_x = math.floor((runs[0][0] - top_left_x) / obj_scale)
+        end_tex_x = min(tile_size, math.ceil((runs[-1][1] - top_left_x) / obj_scale))
+        first_tex_y = math.floor((visible_top - top_left_y) / obj_scale)
+        end_tex_y = min(tile_size, math.ceil((visible_bottom - top_left_y) / obj_scale))
+
+        scaled_left = top_left_x + math.floor(first_tex_x * obj_scale)
+        scaled_top = top_left_y + math.floor(first_tex_y * obj_scale)
+        scaled_size = (top_left_x + math.ceil(end_tex_x * obj_scale) - scaled_left,
+                       top_left_y + math.ceil(end_tex_y * obj_scale) - scaled_top)
+
+        texels = tile_surface.subsurface(
+            pygame.Rect(first_tex_x, first_tex_y, end_tex_x - first_tex_x, end_tex_y - first_tex_y)
+        )
+        scaled = pygame.transform.smoothscale(texels, scaled_size)
+
+        for run_start, run_end in runs:
             self.display_surface.blit(
-                tile_slice,
-                (x_on_screen, top_left_y)
+                scaled,
+                (run_start, scaled_top),
+                pygame.Rect(run_start - scaled_left, 0, run_end - run_start, scaled_size[1])
             )
@@ -0,0 +1,49 @@
+import math
+
+import pygame
+
+from engine.rendering.ray_hit_buffer import RayHitBuffer
+from engine.surfaces.surface_map import SurfaceMap
+from engine.utils.vector_cast import EMPTY_CELL
+
+
+class BlitWallRenderer:
+    """
+    Draws the walls by scaling a 1px wide slice of the wall texture for each column and blitting it to the screen.
+
+    Columns taller than the screen, from walls close to the camera, only have the part of the slice which is on screen
+    scaled, so they cost about the same as a column the height of the screen however close the wall gets.
+    """
+
+    def __init__(self, surface_map: SurfaceMap):
+        self.surface_map = surface_map
+
+    def draw(self, surface: pygame.Surface, start_x: int, ray_hits: RayHitBuffer):
+        """
+        Draw a column of wall for every column in ray_hits onto the surface, starting at screen x start_x.
+        """
+        win_h = surface.get_height()
+        half_win_h = win_h / 2
+        tex_xs = ray_hits.texture_columns(self.surface_map.tile_size)
+
+        for i, (texture_id, tex_x, column_height, column_top) in enumerate(zip(
+                ray_hits.texture_id.tolist(), tex_xs.tolist(), ray_hits.column_height.tolist(),
+                ray_hits.column_top.tolist())):
+
+            if texture_id == EMPTY_CELL:
+                continue  # nothing within draw distance
+
+            if column_height > win_h:
+                tile_slice, column_start_y = self.surface_map.get_clipped_tile_slice(
+                    texture_id, 0, tex_x, column_height, column_top, win_h
+                )
+                surface.blit(tile_slice, (i + start_x, column_start_y))
+                continue
+
+            tile_slice = self.surface_map.get_tile_slice(texture_id, 0, tex_x, math.floor(column_height))
+
+            # centre on the height of the slice we got back, which may have been rounded by the slice cache
+            column_start_y = math.floor(half_win_h - (tile_slice.get_height() / 2))
+
+            # pixel x on the screen, same as i except in dev mode, where we render the map on the left
+            surface.blit(tile_slice, (i + start_x, column_start_y))
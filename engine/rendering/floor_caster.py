@@ -0,0 +1,134 @@
+from typing import Optional
+
+import numpy as np
+import pygame
+
+from engine.rendering.wall_rasterizer import map_texture_array
+
+
+class FloorCaster:
+    """
+    Textures the floor and the ceiling, a whole screen row at a time.
+
+    Every pixel of a screen row below the horizon shows the floor at the same perpendicular distance from the camera, so
+    the world position a pixel shows is the camera position plus that row's distance times the ray direction of the
+    pixel's column (scaled up by the fisheye correction, as the ray direction is a unit vector). That gives the world
+    coordinates for a whole row, or the whole floor, with one outer product, and the fractional parts of those are the
+    texture coordinates. The ceiling is the floor mirrored in the horizon, so the same coordinates are used for both.
+    """
+
+    def __init__(self, textures: np.ndarray, floor_tile: Optional[int], ceiling_tile: Optional[int]):
+        """
+        :param textures: texture array, as returned by build_texture_array
+        :param floor_tile: tile of the textures to draw on the floor, None to leave the floor alone
+        :param ceiling_tile: tile of the textures to draw on the ceiling, None to leave the ceiling alone
+        """
+        self.textures = textures
+        self.tile_size = textures.shape[1]
+        self.floor_tile = floor_tile
+        self.ceiling_tile = ceiling_tile
+
+        # The textures converted to the pixel format of the surface we last drew to, and that format.
+        self._mapped_textures = None
+        self._mapped_format = None
+
+        # Work buffers, reused between frames
+        self._coords = None
+        self._tex_xs = None
+        self._tex_ys = None
+
+    def draw(self, surface: pygame.Surface, start_x: int, origin_x: float, origin_y: float, dir_x: np.ndarray,
+             dir_y: np.ndarray, fisheye_correction: np.ndarray, column_heights: Optional[np.ndarray] = None):
+        """
+        Draw the floor and ceiling onto a 32 bit surface, for a run of columns starting at screen x start_x.
+
+        :param dir_x: x component of each column's ray direction
+        :param dir_y: y component of each column's ray direction
+        :param fisheye_correction: cos of each column's angle away from the centre line
+        :param column_heights: height of the wall in each column, if the walls have already been cast. Rows which are
+            covered by the wall in every column are skipped.
+        """
+        surface_format = (surface.get_bitsize(), surface.get_masks())
+        if surface_format != self._mapped_format:
+            self._mapped_textures = map_texture_array(self.textures, surface)
+            self._mapped_format = surface_format
+
+        frame = pygame.surfarray.pixels2d(surface).T
+        self.cast(frame[:, start_x:start_x + dir_x.size], self._mapped_textures, origin_x, origin_y, dir_x, dir_y,
+                  fisheye_correction, column_heights)
+
+        # the surface is locked for as long as the pixel array exists
+        del frame
+
+    def cast(self, frame: np.ndarray, textures: np.ndarray, origin_x: float, origin_y: float, dir_x: np.ndarray,
+             dir_y: np.ndarray, fisheye_correction: np.ndarray, column_heights: Optional[np.ndarray] = None):
+        """
+        Writes the floor and ceiling into a frame in one vectorised pass. Like WallRasterizer.rasterize this only
+        touches numpy arrays.
+
+        :param frame: 32 bit pixels to draw on, indexed [y, x] and shaped (screen height, columns)
+        :param textures: mapped texture array, as returned by map_texture_array, indexed [tile, x, y]
+        """
+        win_h, columns = frame.shape
+        tile_size = self.tile_size
+        half_win_h = win_h / 2
+
+        # Floor rows run from the horizon to the bottom of the screen. With an odd height the middle row is right on
+        # the horizon, where the floor is infinitely far away, so it's left to the background. Rows close to the
+        # horizon may be hidden behind the walls in every column, in which case there's no need to work them out.
+        first_row = (win_h + 1) // 2
+        if column_heights is not None:
+            lowest_wall_bottom = half_win_h + np.nan_to_num(column_heights, posinf=win_h).min() / 2
+            first_row = max(first_row, min(win_h, int(lowest_wall_bottom)))
+        rows = win_h - first_row
+        if rows <= 0:
+            return
+
+        self._allocate_buffers(win_h // 2, columns)
+        coords = self._coords[:rows]
+        tex_xs = self._tex_xs[:rows]
+        tex_ys = self._tex_ys[:rows]
+
+        # Perpendicular distance to the floor shown by each row. A wall at distance d is win_h / d tall and centred on
+        # the horizon, so the floor at the bottom of it is (win_h / d) / 2 below the horizon.
+        row_offsets = np.arange(first_row, win_h, dtype=np.float32) + 0.5 - half_win_h
+        row_distances = (win_h / (2 * row_offsets))[:, np.newaxis]
+
+        # ray direction per unit of perpendicular distance, in texels
+        ray_x = (dir_x / fisheye_correction * tile_size).astype(np.float32)
+        ray_y = (dir_y / fisheye_correction * tile_size).astype(np.float32)
+
+        # texel x and y of every floor pixel in world space
+        for ray, origin, tex in ((ray_x, origin_x, tex_xs), (ray_y, origin_y, tex_ys)):
+            np.multiply(row_distances, ray, out=coords)
+            coords += np.float32(origin * tile_size)
+            np.copyto(tex, coords, casting='unsafe')
+
+        # texel y within the tile
+        if tile_size & (tile_size - 1) == 0:
+            np.bitwise_and(tex_ys, tile_size - 1, out=tex_ys)  # much quicker than mod, for powers of two
+        else:
+            np.mod(tex_ys, tile_size, out=tex_ys)
+
+        # Index of each texel within the flattened tile, which is indexed [x, y]. Taking with mode='wrap' wraps the
+        # index to the size of the tile, and x * tile_size wrapped to tile_size ** 2 is the same as x wrapped to
+        # tile_size, times tile_size, so that saves wrapping x separately.
+        tex_xs *= tile_size
+        tex_xs += tex_ys
+
+        if self.floor_tile is not None:
+            np.take(textures[self.floor_tile].reshape(-1), tex_xs, out=frame[first_row:], mode='wrap')
+
+        if self.ceiling_tile is not None:
+            # the ceiling row mirroring each floor row, so the first floor row's is the last ceiling row
+            ceiling = frame[win_h - 1 - first_row::-1]
+            np.take(textures[self.ceiling_tile].reshape(-1), tex_xs, out=ceiling, mode='wrap')
+
+    def _allocate_buffers(self, rows: int, columns: int):
+        if self._coords is not None and self._coords.shape == (rows, columns):
+            return
+
+        self._coords = np.empty((rows, columns), dtype=np.float32)
+        # take() needs intp indices, anything else gets converted on every call
+        self._tex_xs = np.empty((rows, columns), dtype=np.intp)
+        self._tex_ys = np.empty((rows, columns), dtype=np.intp)
@@ -0,0 +1,121 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from engine.utils.vector_cast import EMPTY_CELL
+
+
+class RayHitBuffer:
+    """
+    What each column's ray hit this frame, as one preallocated array per field (a struct of arrays), so that casting
+    the rays and everything that uses the results can be kept apart. The raycaster fills it in, the wall renderers draw
+    from it, and the depth map the sprites are checked against is its distance array.
+
+    The raw fields come straight from casting (see vector_cast.cast_rays):
+
+    * distance - distance along the ray to the wall, infinite if there's no wall within draw distance
+    * cell_x, cell_y - map square of the wall that was hit
+    * side - 0 if the ray crossed a whole x to hit the wall, 1 if it crossed a whole y
+    * texture_id - the map symbol of the wall, as a number, EMPTY_CELL if there's no wall
+    * tex_u - fraction along the face of the wall where the ray hit
+
+    The rest are worked out from those by project():
+
+    * perp_distance - distance to the wall perpendicular to the camera plane, i.e. corrected for fisheye
+    * hit_x, hit_y - where in the world the ray hit
+    * column_height, column_top - size and position on the screen of the column of wall
+    """
+
+    # Perpendicular distances are kept at least this far, so a camera right up against a wall (e.g. standing exactly on
+    # the boundary of the square the wall is in, where the ray hits at distance 0) gets a tall column rather than an
+    # infinite one
+    MIN_PERP_DISTANCE = 0.001
+
+    def __init__(self, columns: int):
+        self.columns = columns
+
+        self.distance = np.full(columns, np.inf)
+        self.cell_x = np.full(columns, -1, dtype=np.int64)
+        self.cell_y = np.full(columns, -1, dtype=np.int64)
+        self.side = np.zeros(columns, dtype=np.int8)
+        self.texture_id = np.full(columns, EMPTY_CELL, dtype=np.int16)
+        self.tex_u = np.zeros(columns)
+
+        self.perp_distance = np.full(columns, np.inf)
+        self.hit_x = np.zeros(columns)
+        self.hit_y = np.zeros(columns)
+        self.column_height = np.zeros(columns)
+        self.column_top = np.zeros(columns)
+
+    def set_hits(self, columns: slice, distance: np.ndarray, cell_x: np.ndarray, cell_y: np.ndarray, side: np.ndarray,
+                 texture_id: np.ndarray, tex_u: np.ndarray):
+        """
+        Store the results of casting the rays for a range of columns, in the order vector_cast.cast_rays returns them.
+        """
+        self.distance[columns] = distance
+        self.cell_x[columns] = cell_x
+        self.cell_y[columns] = cell_y
+        self.side[columns] = side
+        self.texture_id[columns] = texture_id
+        self.tex_u[columns] = tex_u
+
+    def shift(self, offset: int):
+        """
+        Move the raw results along so that column i holds what column i + offset held. The columns moved away from are
+        left with stale results, to be overwritten.
+        """
+        if offset == 0:
+            return
+
+        if offset > 0:
+            target, source = slice(0, self.columns - offset), slice(offset, self.columns)
+        else:
+            target, source = slice(-offset, self.columns), slice(0, self.columns + offset)
+
+        # numpy copes with the source and target overlapping
+        for field in (self.distance, self.cell_x, self.cell_y, self.side, self.texture_id, self.tex_u):
+            field[target] = field[source]
+
+    def project(self, origin_x: float, origin_y: float, dir_x: np.ndarray, dir_y: np.ndarray,
+                fisheye_correction: np.ndarray, win_h: int):
+        """
+        Work out the rest of the fields from the raw results, for a camera at origin_x, origin_y with each column's ray
+        going in the direction dir_x, dir_y.
+        """
+        np.multiply(self.distance, fisheye_correction, out=self.perp_distance)
+        np.maximum(self.perp_distance, self.MIN_PERP_DISTANCE, out=self.perp_distance)
+
+        with np.errstate(invalid='ignore'):  # inf * 0 for rays which missed along an axis
+            np.multiply(self.distance, dir_x, out=self.hit_x)
+            np.multiply(self.distance, dir_y, out=self.hit_y)
+        self.hit_x += origin_x
+        self.hit_y += origin_y
+
+        # if we're looking straight at a wall, the column height is the win_h / distance
+        with np.errstate(divide='ignore'):
+            np.divide(win_h, self.perp_distance, out=self.column_height)
+        np.subtract(win_h / 2, self.column_height / 2, out=self.column_top)
+
+    def texture_columns(self, tile_size: int) -> np.ndarray:
+        """
+        Since the wall texture tiles are mapped 1:1 with map squares, the fraction along the wall face where the ray
+        hit tells us the horizontal slice of the texture to get.
+
+        :return: texel column of the wall texture for each column
+        """
+        return np.minimum((self.tex_u * tile_size).astype(int), tile_size - 1)
+
+    def visible_runs(self, start: int, end: int, distance: float) -> List[Tuple[int, int]]:
+        """
+        Find the runs of columns between start and end where something at the given distance would be in front of the
+        walls, by comparing against the depth buffer for the whole span at once.
+
+        :return: (first column, column after the last) of each run, in order
+        """
+        visible = np.empty(end - start + 2, dtype=bool)
+        visible[0] = visible[-1] = False
+        np.less_equal(distance, self.distance[start:end], out=visible[1:-1])
+
+        # the columns where visibility changes are where runs start and end
+        edges = np.flatnonzero(visible[1:] != visible[:-1]) + start
+        return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
@@ -0,0 +1,227 @@
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from timeit import default_timer as timer
+from typing import List, Tuple
+
+import numpy as np
+import pygame
+
+from engine.rendering.ray_hit_buffer import RayHitBuffer
+from engine.rendering.wall_rasterizer import WallRasterizer
+from engine.utils import vector_cast
+
+# What the workers send back for each column, in the order vector_cast.cast_rays returns them
+HIT_FIELDS = (
+    ('distance', np.float64),
+    ('cell_x', np.int64),
+    ('cell_y', np.int64),
+    ('side', np.int8),
+    ('texture_id', np.int16),
+    ('tex_u', np.float64),
+)
+
+
+def _create_shared_array(shape: tuple, dtype, blocks: List[shared_memory.SharedMemory]) -> Tuple[np.ndarray, dict]:
+    """
+    Allocates an array in shared memory. The block is added to blocks so it can be freed later.
+
+    :return: the array, and the description workers need to attach to it
+    """
+    size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    block = shared_memory.SharedMemory(create=True, size=size)
+    blocks.append(block)
+    array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return array, {'name': block.name, 'shape': shape, 'dtype': np.dtype(dtype).str}
+
+
+def _attach_shared_array(description: dict, blocks: List[shared_memory.SharedMemory]) -> np.ndarray:
+    """
+    Attaches a worker to an array created by _create_shared_array.
+    """
+    # Spawned workers share the main process' resource tracker, so attaching registers the same name again (a no-op),
+    # and the main process unlinking the memory in close() is what cleans it up
+    block = shared_memory.SharedMemory(name=description['name'])
+    blocks.append(block)
+    return np.ndarray(description['shape'], dtype=np.dtype(description['dtype']), buffer=block.buf)
+
+
+def _worker_main(conn: Connection, arrays: dict, stripe_start: int, stripe_end: int, max_distance: float):
+    """
+    Entry point of each worker process. Waits for a camera position from the main process, then casts and rasterizes
+    its stripe of the screen into the shared framebuffer, and replies with how long it took. Stops when sent None.
+    """
+    blocks = []
+    wall_grid = _attach_shared_array(arrays['wall_grid'], blocks)
+    textures = _attach_shared_array(arrays['textures'], blocks)
+    camera_dir_x = _attach_shared_array(arrays['camera_dir_x'], blocks)[stripe_start:stripe_end]
+    camera_dir_y = _attach_shared_array(arrays['camera_dir_y'], blocks)[stripe_start:stripe_end]
+    fisheye_correction = _attach_shared_array(arrays['fisheye_correction'], blocks)[stripe_start:stripe_end]
+    framebuffer = _attach_shared_array(arrays['framebuffer'], blocks)[:, stripe_start:stripe_end]
+    hit_fields = [_attach_shared_array(arrays[name], blocks)[stripe_start:stripe_end] for name, _ in HIT_FIELDS]
+
+    win_h = framebuffer.shape[0]
+    tile_size = textures.shape[1]
+    rasterizer = WallRasterizer(textures)
+
+    try:
+        while True:
+            camera = conn.recv()
+            if camera is None:
+                break
+
+            start = timer()
+            origin_x, origin_y, cos_angle, sin_angle = camera
+
+            dir_x = camera_dir_x * cos_angle - camera_dir_y * sin_angle
+            dir_y = camera_dir_x * sin_angle + camera_dir_y * cos_angle
+            hits = vector_cast.cast_rays(wall_grid, origin_x, origin_y, dir_x, dir_y, max_distance)
+            distances, _, _, _, texture_ids, tex_us = hits
+
+            # clamped like RayHitBuffer.project, so a wall at distance 0 is tall rather than infinite
+            column_heights = win_h / np.maximum(distances * fisheye_correction, RayHitBuffer.MIN_PERP_DISTANCE)
+            tex_xs = np.minimum((tex_us * tile_size).astype(int), tile_size - 1)
+            rasterizer.rasterize(framebuffer, textures, texture_ids, tex_xs, column_heights)
+
+            for hit_field, hit in zip(hit_fields, hits):
+                hit_field[:] = hit
+
+            conn.send(timer() - start)
+    finally:
+        # the arrays have to go before the memory they're views of can be closed
+        del wall_grid, textures, camera_dir_x, camera_dir_y, fisheye_correction, framebuffer, hit_fields
+        rasterizer = None
+        for block in blocks:
+            block.close()
+
+
+class StripedRenderer:
+    """
+    Renders the walls with several worker processes, each of which casts and rasterizes a vertical stripe of the
+    screen, getting around the GIL on machines with lots of cores.
+
+    The level grid, the textures and the camera tables are put in shared memory once, and the workers only read them.
+    Each frame the main process copies the current screen into a shared framebuffer, sends each worker the camera
+    position, and once they're all done copies the framebuffer (now with the walls on it) back to the screen in one go.
+    """
+
+    def __init__(self, worker_count: int, wall_grid: np.ndarray, textures: np.ndarray, camera_dir_x: np.ndarray,
+                 camera_dir_y: np.ndarray, fisheye_correction: np.ndarray, win_h: int, max_distance: float):
+        """
+        :param worker_count: number of worker processes, each renders one stripe
+        :param wall_grid: level map, as from vector_cast.build_wall_grid
+        :param textures: wall textures mapped to the pixel format of the surface being drawn to, as from
+            wall_rasterizer.map_texture_array
+        :param camera_dir_x: the raycaster's camera table, one entry per column
+        :param camera_dir_y: the raycaster's camera table, one entry per column
+        :param fisheye_correction: the raycaster's camera table, one entry per column
+        :param win_h: height of the render area
+        :param max_distance: how far rays travel looking for walls
+        """
+        columns = camera_dir_x.size
+        self.worker_count = worker_count
+
+        # how long each worker took to render its stripe last frame
+        self.worker_timings = [0.0] * worker_count
+
+        self._blocks = []
+        self._shared = {}
+        self.framebuffer = None
+        self.hits = []
+        self._connections = []
+        self._processes = []
+
+        try:
+            arrays = {}
+            for name, source in (('wall_grid', wall_grid), ('textures', textures), ('camera_dir_x', camera_dir_x),
+                                 ('camera_dir_y', camera_dir_y), ('fisheye_correction', fisheye_correction)):
+                self._shared[name], arrays[name] = _create_shared_array(source.shape, source.dtype, self._blocks)
+                self._shared[name][:] = source
+
+            self.framebuffer, arrays['framebuffer'] = _create_shared_array((win_h, columns), np.uint32, self._blocks)
+            for name, dtype in HIT_FIELDS:
+                hit_field, arrays[name] = _create_shared_array((columns,), dtype, self._blocks)
+                self.hits.append(hit_field)
+
+            # spawn rather than fork, the main process has SDL running
+            context = multiprocessing.get_context('spawn')
+            stripe_bounds = np.linspace(0, columns, worker_count + 1).astype(int).tolist()
+
+            for stripe_start, stripe_end in zip(stripe_bounds, stripe_bounds[1:]):
+                parent_conn, child_conn = context.Pipe()
+                process = context.Process(
+                    target=_worker_main,
+                    args=(child_conn, arrays, stripe_start, stripe_end, max_distance),
+                    daemon=True
+                )
+                process.start()
+                # the worker has its end now, so if it dies the main process gets an EOFError rather than waiting
+                child_conn.close()
+                self._connections.append(parent_conn)
+                self._processes.append(process)
+        except OSError:
+            # e.g. out of shared memory, or not allowed to start processes. Free whatever was set up before it failed.
+            self.close()
+            raise
+
+    def render(self, surface: pygame.Surface, start_x: int, origin_x: float, origin_y: float,
+               angle_from_x_axis: float) -> tuple:
+        """
+        Renders the walls onto a 32 bit surface, starting at screen x start_x.
+
+        :return: (distance, cell_x, cell_y, side, texture_id, tex_u) arrays, as from vector_cast.cast_rays. These are
+            the shared arrays, so are overwritten by the next frame.
+        :raises EOFError, OSError: a worker has died. The renderer is closed, and can't be used after this.
+        """
+        columns = self.framebuffer.shape[1]
+
+        # pixels2d is indexed [x, y], transposed it matches the framebuffer and the layout of the surface's memory
+        frame = pygame.surfarray.pixels2d(surface).T[:, start_x:start_x + columns]
+        self.framebuffer[:] = frame
+
+        camera = (origin_x, origin_y, np.cos(angle_from_x_axis), np.sin(angle_from_x_axis))
+        try:
+            for conn in self._connections:
+                conn.send(camera)
+            self.worker_timings = [conn.recv() for conn in self._connections]
+        except (EOFError, OSError):
+            # a worker has died. Unlock the surface and stop the rest, the caller has to render without them.
+            del frame
+            self.close()
+            raise
+
+        frame[:] = self.framebuffer
+        del frame
+
+        return tuple(self.hits)
+
+    def update_wall_grid(self, wall_grid: np.ndarray):
+        """
+        Copies a changed level map into the workers' shared wall grid. Only call between frames, while the workers are
+        waiting.
+        """
+        self._shared['wall_grid'][:] = wall_grid
+
+    def close(self):
+        """
+        Stops the workers and frees the shared memory.
+        """
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass  # worker has already gone
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._connections = []
+        self._processes = []
+
+        self.framebuffer = None
+        self.hits = []
+        self._shared = {}
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
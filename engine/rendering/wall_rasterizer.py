@@ -0,0 +1,147 @@
+import numpy as np
+import pygame
+
+from engine.rendering.ray_hit_buffer import RayHitBuffer
+from engine.surfaces.surface_map import SurfaceMap
+from engine.utils.vector_cast import EMPTY_CELL
+
+
+def build_texture_array(surface_map: SurfaceMap) -> np.ndarray:
+    """
+    The RGB of every tile in a SurfaceMap as one contiguous array shaped (tiles, tile_size, tile_size, 3), indexed
+    [tile, x, y] like pygame.surfarray, taken from SurfaceMap.pixels. Tiles are numbered the same way as SurfaceMap packs
+    them, i.e. x + y * horizontal_tiles_total.
+    """
+    return np.ascontiguousarray(surface_map.pixels[..., :3])
+
+
+def map_texture_array(textures: np.ndarray, surface: pygame.Surface) -> np.ndarray:
+    """
+    Converts an RGB texture array to the 32 bit pixel values of the given surface's pixel format, so that texels can be
+    copied straight into pygame.surfarray.pixels2d of that surface.
+
+    :raises ValueError: if the surface isn't 32 bits per pixel
+    """
+    if surface.get_bytesize() != 4:
+        raise ValueError("Wall rasterizing needs a 32 bit surface to draw on")
+
+    r_shift, g_shift, b_shift, _ = surface.get_shifts()
+    alpha_mask = surface.get_masks()[3]
+
+    mapped = textures[..., 0].astype(np.uint32) << r_shift
+    mapped |= textures[..., 1].astype(np.uint32) << g_shift
+    mapped |= textures[..., 2].astype(np.uint32) << b_shift
+    mapped |= np.uint32(alpha_mask)  # fully opaque
+    return mapped
+
+
+class WallRasterizer:
+    """
+    Draws wall columns straight into a surface's pixels, rather than scaling a new 1px wide surface for each column and
+    blitting it. The textures are kept as one contiguous array so all the columns can be sampled at once.
+    """
+
+    def __init__(self, textures: np.ndarray):
+        """
+        :param textures: texture array, as returned by build_texture_array (or map_texture_array if this is only
+            going to be used to rasterize)
+        """
+        self.textures = textures
+        self.tile_size = textures.shape[1]
+
+        # The textures converted to the pixel format of the surface we last drew to, and that format.
+        self._mapped_textures = None
+        self._mapped_format = None
+
+        # Work buffers, reused between frames to save allocating several MB of arrays every frame.
+        self._tex_ys = None
+        self._texel_indices = None
+        self._on_wall = None
+        self._in_range = None
+        self._texels = None
+
+    def draw(self, surface: pygame.Surface, start_x: int, ray_hits: RayHitBuffer):
+        """
+        Draw a column of wall for every column in ray_hits onto the surface, starting at screen x start_x.
+        """
+        surface_format = (surface.get_bitsize(), surface.get_masks())
+        if surface_format != self._mapped_format:
+            self._mapped_textures = map_texture_array(self.textures, surface)
+            self._mapped_format = surface_format
+
+        # pixels2d is indexed [x, y], transposing it gives [y, x], which matches how the pixels are laid out in memory
+        frame = pygame.surfarray.pixels2d(surface).T
+        self.rasterize(frame[:, start_x:start_x + ray_hits.columns], self._mapped_textures, ray_hits.texture_id,
+                       ray_hits.texture_columns(self.tile_size), ray_hits.column_height)
+
+        # the surface is locked for as long as the pixel array exists
+        del frame
+
+    def rasterize(self, frame: np.ndarray, textures: np.ndarray, texture_ids: np.ndarray, tex_xs: np.ndarray,
+                  column_heights: np.ndarray):
+        """
+        Writes a run of wall columns into a frame in one vectorised pass.
+
+        For every screen row a wall column covers we work out which texel row of the texture lands there, then gather
+        all the texels for all the columns from the texture array with one fancy index, and copy them into the frame
+        wherever a wall is. This is nearest neighbour sampling rather than the smoothing smoothscale does.
+
+        This only touches numpy arrays, so can be used on any array of pixels, not just a locked surface.
+
+        :param frame: 32 bit pixels to draw on, indexed [y, x] and shaped (screen height, columns)
+        :param textures: mapped texture array, as returned by map_texture_array, indexed [tile, x, y]
+        :param texture_ids: tile to draw in each column, EMPTY_CELL for columns with no wall
+        :param tex_xs: texel column of the tile to draw in each column
+        :param column_heights: height on screen of the wall in each column
+        """
+        win_h, columns = frame.shape
+        tile_size = self.tile_size
+
+        visible = texture_ids != EMPTY_CELL
+        if not visible.any():
+            return
+
+        self._allocate_buffers(win_h, columns)
+
+        heights = np.where(visible, column_heights, 1).astype(np.float32)
+        tops = (win_h - heights) / 2
+
+        # only the band of rows covered by the tallest wall needs looking at
+        tallest = heights[visible].max()
+        band_start = max(0, int((win_h - tallest) // 2))
+        band_end = min(win_h, win_h - band_start)
+        band_rows = band_end - band_start
+
+        tex_ys = self._tex_ys[:band_rows]
+        texel_indices = self._texel_indices[:band_rows]
+        on_wall = self._on_wall[:band_rows]
+        in_range = self._in_range[:band_rows]
+        texels = self._texels[:band_rows]
+
+        # texel row of each pixel of the band, which is on the wall if it's within the texture
+        rows = np.arange(band_start, band_end, dtype=np.float32)[:, np.newaxis]
+        np.subtract(rows, tops, out=tex_ys)
+        np.multiply(tex_ys, tile_size / heights, out=tex_ys)
+        np.greater_equal(tex_ys, 0, out=on_wall)
+        np.less(tex_ys, tile_size, out=in_range)
+        np.logical_and(on_wall, in_range, out=on_wall)
+        np.logical_and(on_wall, visible, out=on_wall)
+
+        # index of each texel in the flattened texture array: the start of the texture column, plus the row
+        np.copyto(texel_indices, tex_ys, casting='unsafe')
+        np.clip(texel_indices, 0, tile_size - 1, out=texel_indices)
+        column_starts = (np.where(visible, texture_ids, 0) * tile_size + tex_xs) * tile_size
+        np.add(texel_indices, column_starts, out=texel_indices)
+
+        np.take(textures.reshape(-1), texel_indices, out=texels)
+        np.copyto(frame[band_start:band_end], texels, where=on_wall)
+
+    def _allocate_buffers(self, win_h: int, columns: int):
+        if self._tex_ys is not None and self._tex_ys.shape == (win_h, columns):
+            return
+
+        self._tex_ys = np.empty((win_h, columns), dtype=np.float32)
+        self._texel_indices = np.empty((win_h, columns), dtype=np.intp)
+        self._on_wall = np.empty((win_h, columns), dtype=bool)
+        self._in_range = np.empty((win_h, columns), dtype=bool)
+        self._texels = np.empty((win_h, columns), dtype=np.uint32)
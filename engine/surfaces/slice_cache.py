@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from typing import Collection, Hashable, Optional
+
+import pygame
+
+
+class SliceCache:
+    """
+    A bounded, least recently used (LRU) cache of scaled texture slices.
+
+    Adjacent columns on the screen, and the same column on consecutive frames, keep asking for the same slice of the
+    same tile scaled to the same height, and every request was a fresh smoothscale. The cache keeps the scaled slices
+    until it goes over its memory budget, at which point the slices which haven't been used for longest are dropped.
+
+    Heights are quantized to multiples of height_step, so that walls and objects which are almost the same distance
+    away share slices. Callers should use the height of the slice they get back rather than the height they asked for.
+    """
+
+    DEFAULT_HEIGHT_STEP = 4
+
+    def __init__(self, max_bytes: int, height_step: int = DEFAULT_HEIGHT_STEP):
+        """
+        :param max_bytes: memory budget for the pixels of the cached slices
+        :param height_step: heights are rounded to the nearest multiple of this
+        """
+        self.max_bytes = max_bytes
+        self.height_step = height_step
+        self.used_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._slices = OrderedDict()
+
+    def quantize_height(self, height: int) -> int:
+        """
+        Round a height to the nearest multiple of height_step. Heights smaller than the step are left alone, as being
+        out by a few pixels is noticeable on small slices.
+        """
+        if height <= self.height_step:
+            return height
+        return round(height / self.height_step) * self.height_step
+
+    def get(self, key: Hashable) -> Optional[pygame.Surface]:
+        """
+        Return the slice cached under key, or None if there isn't one.
+        """
+        tile_slice = self._slices.get(key)
+        if tile_slice is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._slices.move_to_end(key)
+        return tile_slice
+
+    def put(self, key: Hashable, tile_slice: pygame.Surface):
+        """
+        Add a slice to the cache, evicting the least recently used slices until it's back within its memory budget.
+        """
+        size = self._slice_bytes(tile_slice)
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+
+        old_slice = self._slices.pop(key, None)
+        if old_slice is not None:
+            self.used_bytes -= self._slice_bytes(old_slice)
+
+        self._slices[key] = tile_slice
+        self.used_bytes += size
+
+        while self.used_bytes > self.max_bytes:
+            _, evicted = self._slices.popitem(last=False)
+            self.used_bytes -= self._slice_bytes(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Drop all cached slices, e.g. when the textures they came from are no longer in use. The counters are kept.
+        """
+        self._slices.clear()
+        self.used_bytes = 0
+
+    def evict_owners(self, owners: Collection[Hashable]):
+        """
+        Drop every slice whose key is a tuple starting with one of owners, e.g. the tiles of a texture which is no
+        longer in use, so the cache doesn't keep them alive. The slices don't count as evictions.
+        """
+        for key in [key for key in self._slices if isinstance(key, tuple) and key[0] in owners]:
+            self.used_bytes -= self._slice_bytes(self._slices.pop(key))
+
+    def stats(self) -> dict:
+        """
+        Return the cache counters, e.g. for printing alongside frame times.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._slices),
+            "used_bytes": self.used_bytes,
+        }
+
+    @staticmethod
+    def _slice_bytes(tile_slice: pygame.Surface) -> int:
+        return tile_slice.get_width() * tile_slice.get_height() * tile_slice.get_bytesize()
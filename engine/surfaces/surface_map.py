@@ -1,6 +1,7 @@
 import math
-from typing import Union
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
 import pygame
 
 from .surface_exceptions import TextureLookupException
@@ -19,10 +20,22 @@ class SurfaceMap:
     # transparent before rendering
     OVERLAY_COLOR = (178, 0, 255)
 
-    def __init__(self, surface: pygame.Surface, tile_size: int = DEFAULT_TEXTURE_TILE_SIZE):
+    # Whether tiles build mip levels (see SurfaceTile) when mipmaps isn't given. This is set up by the GameManager from
+    # the config.
+    mipmaps = False
+
+    def __init__(self, surface: pygame.Surface, tile_size: int = DEFAULT_TEXTURE_TILE_SIZE,
+                 mipmaps: Optional[bool] = None, pixels: Optional[np.ndarray] = None,
+                 mip_levels: Optional[List[List[pygame.Surface]]] = None):
         """
         Given a surface and a (optional) tilesize, splits up the surface into subsurfaces (tiles) of w/h tile_size.
 
+        :param mipmaps: have each tile build mip levels, defaults to SurfaceMap.mipmaps
+        :param pixels: the tiles' pixel array (see build_pixel_array) if it's already been made, e.g. by a texture pack.
+            The overlay must already be transparent in both it and the surface.
+        :param mip_levels: each tile's mip levels if they've already been made, used when mipmaps are on (see
+            SurfaceTile)
+
         :raises IOError: can't divide surface by tile size to get a round number of tiles.
         """
 
@@ -35,10 +48,20 @@ class SurfaceMap:
         self.horizontal_tiles_total = math.floor(self.surface.get_width() / tile_size)
         self.vertical_tiles_total = math.floor(self.surface.get_height() / tile_size)
 
-        # Make any overlay on the texture transparent
-        overlay_color = pygame.Color(self.OVERLAY_COLOR)
-        replacement = pygame.Color(0, 0, 0, 0)
-        surface_utils.replace_colour_on_surface(self.surface, overlay_color, replacement)
+        # All of the tiles' pixels as one contiguous array, for renderers which sample many texels at once with numpy
+        # rather than blitting subsurfaces (see build_pixel_array)
+        if pixels is None:
+            # Make any overlay on the texture transparent
+            overlay_color = pygame.Color(self.OVERLAY_COLOR)
+            replacement = pygame.Color(0, 0, 0, 0)
+            surface_utils.replace_colour_on_surface(self.surface, overlay_color, replacement)
+
+            self.pixels, self.transparency = self.build_pixel_array()
+        else:
+            self.pixels, self.transparency = pixels, pixels[..., 3] == 0
+
+        # Every tile's 1px slices, made as they're first asked for, tile after tile
+        self._slice_table = [None] * (self.horizontal_tiles_total * self.vertical_tiles_total * tile_size)
 
         # This will be a 2d array packed into a 1d one
         self._tiles = []
@@ -46,9 +69,32 @@ class SurfaceMap:
             for hrz in range(self.horizontal_tiles_total):
                 tile_rect = pygame.Rect(hrz * self.tile_size, vert * self.tile_size, self.tile_size, self.tile_size)
                 subsurface = self.surface.subsurface(tile_rect)
-                tile = SurfaceTile(subsurface)
+                tile = SurfaceTile(subsurface, mipmaps=self.mipmaps if mipmaps is None else mipmaps,
+                                   slice_table=self._slice_table, slice_offset=len(self._tiles) * tile_size,
+                                   mip_levels=mip_levels[len(self._tiles)] if mip_levels else None)
                 self._tiles.append(tile)
 
+    def build_pixel_array(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Copies the pixels of every tile into one contiguous uint8 array shaped (tiles, tile_size, tile_size, 4) of RGBA,
+        indexed [tile, x, y, channel] like pygame.surfarray. Tiles are numbered the same way as the tiles are packed,
+        i.e. x + y * horizontal_tiles_total.
+
+        :return: the pixels, and a mask of the fully transparent ones shaped (tiles, tile_size, tile_size)
+        """
+        # tobytes gives rows of pixels, so (height, width, 4), which is much quicker than copying out the colours and
+        # the alpha separately with surfarray
+        width, height = self.surface.get_size()
+        pixels = np.frombuffer(pygame.image.tobytes(self.surface, 'RGBA'), dtype=np.uint8)
+        pixels = pixels.reshape(height, width, 4).transpose(1, 0, 2)
+
+        # (width, height, 4) -> (horizontal tiles, tile x, vertical tiles, tile y, 4) -> tiles packed row by row
+        tile_size = self.tile_size
+        pixels = pixels.reshape(self.horizontal_tiles_total, tile_size, self.vertical_tiles_total, tile_size, 4)
+        pixels = np.ascontiguousarray(pixels.transpose(2, 0, 1, 3, 4).reshape(-1, tile_size, tile_size, 4))
+
+        return pixels, pixels[..., 3] == 0
+
     def get_tile_at(self, x: int, y: int) -> SurfaceTile:
         """
         Get the TextureTile at the given x/y coordinate.
@@ -75,14 +121,43 @@ class SurfaceMap:
         :param tile_slice_at_x: the pixel location on the tile to slice at.
         :param scale_to_h: the height to scale the slice to (will take a full vert-slice and scale to this size)
         """
-        # fetch the tile
+        # fetch the tile and let it do the slicing and scaling (which may come from the slice cache)
         tile = self.get_tile_at(tile_x, tile_y)
 
-        tile_slice = tile.get_slice_at_x(tile_slice_at_x)
+        return tile.get_scaled_slice_at_x(tile_slice_at_x, scale_to_h)
 
-        # do the scaling
-        tile_slice = pygame.transform.smoothscale(tile_slice, (1, scale_to_h))
+    def get_clipped_tile_slice(self, tile_x: int, tile_y: int, tile_slice_at_x: int, scale_to_h: float, top: float,
+                               visible_h: int) -> Tuple[pygame.Surface, int]:
+        """
+        Like get_tile_slice, but for slices taller than the screen: only scales the part of the slice which lands
+        between screen y 0 and visible_h. See SurfaceTile.get_clipped_slice_at_x.
 
-        return tile_slice
+        :param scale_to_h: the height of the whole slice on screen
+        :param top: screen y of the top of the whole slice
+        :param visible_h: the height of the screen
+        :return: the scaled slice and the screen y to draw it at
+        """
+        tile = self.get_tile_at(tile_x, tile_y)
+
+        return tile.get_clipped_slice_at_x(tile_slice_at_x, scale_to_h, top, visible_h)
+
+    def evict_cached_slices(self):
+        """
+        Drop the tiles' scaled slices from the slice cache (see SurfaceTile.slice_cache), if there is one. The cache
+        keys slices by tile, so without this it would keep the tiles, and so the whole texture, alive after the texture
+        is no longer used.
+        """
+        if SurfaceTile.slice_cache is not None:
+            SurfaceTile.slice_cache.evict_owners(set(self._tiles))
 
+    def get_slice_count(self) -> int:
+        """
+        How many of the tiles' 1px slices have been made so far (not counting mip levels)
+        """
+        return sum(tile_slice is not None for tile_slice in self._slice_table)
 
+    def get_mipmap_bytes(self) -> int:
+        """
+        Memory used by all of the tiles' mip levels, 0 without mipmaps
+        """
+        return sum(tile.get_mipmap_bytes() for tile in self._tiles)
@@ -1,40 +1,189 @@
-from typing import List
+import math
+from typing import List, Optional, Tuple
 
 import pygame
 
+from .slice_cache import SliceCache
+
 
 class SurfaceTile:
 
-    def __init__(self, surface):
+    # Cache of scaled slices shared by every tile. None means slices are scaled every time they're asked for. This is
+    # set up by the GameManager from the config.
+    slice_cache: Optional[SliceCache] = None
+
+    def __init__(self, surface, mipmaps: bool = False, slice_table: Optional[List[Optional[pygame.Surface]]] = None,
+                 slice_offset: int = 0, mip_levels: Optional[List[pygame.Surface]] = None):
+        """
+        The 1 pixel wide slices of the tile needed for raycasting are only made the first time each is asked for, so
+        tiles which are never drawn a slice at a time (e.g. when the walls are drawn by the surfarray renderer) never
+        make any.
+
+        :param mipmaps: also keep copies of the tile scaled down to half, a quarter, an eighth etc. of its size (down
+            to 1px), each with its own slices, so that tiles drawn small are scaled down from the nearest size rather
+            than from the full tile
+        :param slice_table: list to keep the tile's slices in once they're made, from slice_offset onwards. SurfaceMap
+            shares one between all of its tiles. The tile makes its own if not given.
+        :param mip_levels: with mipmaps, mip levels made before (e.g. by a texture pack, see get_mip_levels) to use
+            rather than generating them
+        """
         self.surface = surface
-        self._slices = self._generate_slice_array()
 
-    def _generate_slice_array(self) -> List[pygame.Surface]:
+        if slice_table is None:
+            slice_table = [None] * surface.get_width()
+            slice_offset = 0
+        self._slice_table = slice_table
+        self._slice_offset = slice_offset
+
+        # mip level 0 is the tile itself, whose slices are in the slice table
+        self._mip_levels = [surface]
+        self._mip_slices = [None]
+        if mipmaps and mip_levels:
+            self._mip_levels.extend(mip_levels)
+            self._mip_slices.extend([None] * mip_level.get_width() for mip_level in mip_levels)
+        elif mipmaps:
+            self._generate_mip_levels()
+
+    @staticmethod
+    def _make_slice(surface: pygame.Surface, x: int) -> pygame.Surface:
+        """
+        Creates a 1 pixel wide slice of a tile (or a mip level of it) at pix loc x, as a subsurface of it
         """
-        Creates an array of 1 pixel wide slices of this tile needed for raycasting.
+        return surface.subsurface(pygame.Rect(x, 0, 1, surface.get_height()))
 
-        :return: slices - list of subsurfaces of self.surface
-        :rtype: list
+    def _generate_mip_levels(self):
         """
-        slices = []
-        for x in range(self.surface.get_width()):
-            slice_rect = pygame.Rect(x, 0, 1, self.surface.get_width())
-            slices.append(self.surface.subsurface(slice_rect))
-        return slices
+        Halves the tile repeatedly, each level scaled down from the one before, until it's 1px across.
+        """
+        mip_level = self.surface
+        while mip_level.get_width() > 1 and mip_level.get_height() > 1:
+            mip_level = pygame.transform.smoothscale(
+                mip_level, (mip_level.get_width() // 2, mip_level.get_height() // 2)
+            )
+            self._mip_levels.append(mip_level)
+            self._mip_slices.append([None] * mip_level.get_width())
 
     def get_slice_at_x(self, x: int) -> pygame.Surface:
-        return self._slices[x]
+        index = self._slice_offset + x
+        tile_slice = self._slice_table[index]
+        if tile_slice is None:
+            tile_slice = self._slice_table[index] = self._make_slice(self.surface, x)
+        return tile_slice
+
+    def _get_mip_slice_at_x(self, mip_level: int, x: int) -> pygame.Surface:
+        """
+        The slice of a mip level at pix loc x of the full tile
+        """
+        if mip_level == 0:
+            return self.get_slice_at_x(x)
+
+        mip_slices = self._mip_slices[mip_level]
+        mip_x = x * len(mip_slices) // self.surface.get_width()
+        mip_slice = mip_slices[mip_x]
+        if mip_slice is None:
+            mip_slice = mip_slices[mip_x] = self._make_slice(self._mip_levels[mip_level], mip_x)
+        return mip_slice
+
+    def get_mip_level(self, scale_to_h: int) -> int:
+        """
+        The smallest mip level which is still at least scale_to_h tall, so scaling it to that height never scales it
+        up. Always 0 without mipmaps.
+        """
+        mip_level = 0
+        while mip_level + 1 < len(self._mip_levels) and self._mip_levels[mip_level + 1].get_height() >= scale_to_h:
+            mip_level += 1
+        return mip_level
+
+    def get_mip_surface(self, scale_to_h: int) -> pygame.Surface:
+        """
+        The whole tile at the smallest mip level which is still at least scale_to_h tall (see get_mip_level)
+        """
+        return self._mip_levels[self.get_mip_level(scale_to_h)]
+
+    def get_mip_levels(self) -> List[pygame.Surface]:
+        """
+        The tile's mip levels, largest first, not counting the tile itself. Empty without mipmaps.
+        """
+        return self._mip_levels[1:]
+
+    def get_mipmap_bytes(self) -> int:
+        """
+        Memory used by the mip levels' pixels, not counting the tile itself
+        """
+        return sum(
+            mip_level.get_width() * mip_level.get_height() * mip_level.get_bytesize()
+            for mip_level in self._mip_levels[1:]
+        )
+
+    def _scale_slice(self, x: int, scale_to_h: int) -> pygame.Surface:
+        """
+        Scale the slice at pix loc x of the full tile to a height, starting from the best mip level.
+        """
+        mip_slice = self._get_mip_slice_at_x(self.get_mip_level(scale_to_h), x)
+        if mip_slice.get_height() == scale_to_h:
+            return mip_slice  # already the right size
+        return pygame.transform.smoothscale(mip_slice, (1, scale_to_h))
 
     def get_scaled_slice_at_x(self, x: int, scale_to_h: int) -> pygame.Surface:
         """
-        Get a vertical slice of this tile at pix loc x, and scale it to a desired height.
+        Get a vertical slice of this tile at pix loc x, and scale it to a desired height. With mipmaps, the slice is
+        scaled from the smallest mip level at least that tall, or returned as it is if a mip level is exactly that tall.
+
+        If the slice cache is enabled the height is quantized (see SliceCache), so the slice returned may be a few
+        pixels off the height asked for.
 
         :param x: the pixel location on the tile to slice at.
         :param scale_to_h: the height to scale the slice to (will take a full vert-slice and scale to this size)
         :return:
         """
-        tile_slice = self.get_slice_at_x(x)
+        slice_cache = self.slice_cache
+        if slice_cache is None:
+            return self._scale_slice(x, scale_to_h)
+
+        scale_to_h = slice_cache.quantize_height(scale_to_h)
+        key = (self, x, scale_to_h)
+
+        tile_slice = slice_cache.get(key)
+        if tile_slice is None:
+            tile_slice = self._scale_slice(x, scale_to_h)
+            slice_cache.put(key, tile_slice)
+
+        return tile_slice
+
+    def get_clipped_slice_at_x(self, x: int, scale_to_h: float, top: float, visible_h: int) -> Tuple[pygame.Surface, int]:
+        """
+        Get a vertical slice of this tile at pix loc x as it would look scaled to scale_to_h and drawn with its top at
+        screen y top, but only the part of it between screen y 0 and visible_h.
+
+        Only the texels which are at least partly on screen are scaled, so however close the wall is, the slice
+        returned is at most visible_h plus two texels tall. When a single texel is taller than that, the slice is just
+        filled in with the one or two texels showing. Clipped slices are never cached, as the heights and offsets
+        hardly ever repeat.
+
+        :param x: the pixel location on the tile to slice at.
+        :param scale_to_h: the height of the whole slice on screen
+        :param top: screen y of the top of the whole slice, usually above the screen
+        :param visible_h: the height of the screen
+        :return: the scaled slice and the screen y to draw it at
+        """
+        tile_h = self.surface.get_height()
+        texel_h = scale_to_h / tile_h
+
+        # the texels which show on screen
+        first_texel = max(0, math.floor(-top / texel_h))
+        end_texel = min(tile_h, math.ceil((visible_h - top) / texel_h))
+        if end_texel <= first_texel:
+            return pygame.Surface((1, 0)), 0
+        texel_slice = self.get_slice_at_x(x).subsurface(pygame.Rect(0, first_texel, 1, end_texel - first_texel))
 
-        tile_slice = pygame.transform.smoothscale(tile_slice, (1, scale_to_h))
+        if texel_h < visible_h:
+            slice_top = top + first_texel * texel_h
+            slice_h = round(top + end_texel * texel_h) - math.floor(slice_top)
+            return pygame.transform.smoothscale(texel_slice, (1, slice_h)), math.floor(slice_top)
 
-        return tile_slice
\ No newline at end of file
+        # No more than two texels show. Stretch the first over the screen and fill in the second below it.
+        tile_slice = pygame.transform.scale(texel_slice.subsurface(pygame.Rect(0, 0, 1, 1)), (1, visible_h))
+        if end_texel - first_texel > 1:
+            boundary = round(top + (first_texel + 1) * texel_h)
+            tile_slice.fill(texel_slice.get_at((0, 1)), pygame.Rect(0, boundary, 1, visible_h - boundary))
+        return tile_slice, 0
@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 
 
@@ -7,3 +8,31 @@ def replace_colour_on_surface(surface: pygame.Surface, original_colour: pygame.C
     px_arr = pygame.PixelArray(surface)
     px_arr.replace(original_colour, replacement_colour)
     px_arr.close()
+    surface.unlock()
+
+
+def convert_for_display(surface: pygame.Surface, overlay_colour: pygame.Color) -> pygame.Surface:
+    """
+    Converts a texture to the display's pixel format once, so that blitting it (or anything scaled from it) doesn't
+    convert every pixel on every blit. Which format depends on what's in the texture, once any overlay has been made
+    transparent:
+
+    * no transparent pixels at all - convert(), which drops the alpha channel so blits are straight copies
+    * any transparent pixels - convert_alpha(), blended per pixel
+
+    Colorkeys and RLE acceleration aren't used for textures with only fully transparent and fully opaque pixels, even
+    though they could be, because the textures are blitted as subsurfaces or scaled copies and both of those measured
+    slower than per pixel alpha (see docs/algorithm_and_performance.md).
+
+    :return: the converted surface, or the surface as it is if there's no display to convert to yet
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+
+    surface = surface.convert_alpha()
+    replace_colour_on_surface(surface, overlay_colour, pygame.Color(0, 0, 0, 0))
+
+    if np.all(pygame.surfarray.array_alpha(surface) == 255):
+        return surface.convert()
+
+    return surface
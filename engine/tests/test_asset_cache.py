@@ -0,0 +1,65 @@
+import gc
+import unittest
+import weakref
+
+from engine.asset_loaders.asset_cache import AssetCache, AssetSet
+from engine.surfaces.slice_cache import SliceCache
+from engine.surfaces.surface_tile import SurfaceTile
+
+
+class TestAssetCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = AssetCache()
+
+    def test_shared_between_owners(self):
+        first_level = AssetSet(self.cache)
+        second_level = AssetSet(self.cache)
+
+        walls = first_level.get_surface_map('walls.png')
+        self.assertIs(first_level.get_surface_map('walls.png'), walls)
+        self.assertIs(second_level.get_surface_map('walls.png'), walls)
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (2, 1, 1))
+        self.assertEqual(stats['used_bytes'], 384 * 64 * walls.surface.get_bytesize())
+
+    def test_released_when_no_owner_holds_it(self):
+        first_level = AssetSet(self.cache)
+        second_level = AssetSet(self.cache)
+        first_level.get_surface_map('walls.png')
+        first_level.get_surface_map('common/simple_bullet.png')
+        second_level.get_surface_map('walls.png')
+
+        first_level.release()
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['entries'], stats['releases']), (1, 1))
+        second_level.get_surface_map('walls.png')
+        self.assertEqual(self.cache.stats()['misses'], 2)
+
+        second_level.release()
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_released_textures_leave_the_slice_cache(self):
+        SurfaceTile.slice_cache = SliceCache(1024 * 1024)
+        try:
+            level = AssetSet(self.cache)
+            walls = level.get_surface_map('walls.png')
+            walls.get_tile_slice(1, 0, 5, 100)
+            tile = weakref.ref(walls.get_tile_at(1, 0))
+            self.assertEqual(SurfaceTile.slice_cache.stats()['entries'], 1)
+
+            del walls
+            level.release()
+            gc.collect()
+
+            self.assertIsNone(tile())
+            self.assertEqual(SurfaceTile.slice_cache.stats()['entries'], 0)
+            self.assertEqual(SurfaceTile.slice_cache.used_bytes, 0)
+        finally:
+            SurfaceTile.slice_cache = None
+
+
+if __name__ == '__main__':
+    unittest.main()
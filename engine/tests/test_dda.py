@@ -0,0 +1,73 @@
+import math
+import unittest
+
+import numpy as np
+
+from engine.level_objects.levelmap import LevelMap
+from engine.utils import dda, vector_cast
+
+
+class TestDDA(unittest.TestCase):
+
+    def setUp(self):
+        self.level_map = LevelMap(
+            "0000"
+            "0  1"
+            "0  1"
+            "2222",
+            4,
+            4
+        )
+
+    def test_cast_ray_along_x(self):
+        hit = dda.cast_ray(self.level_map, 1.5, 1.25, 1.0, 0.0, 16)
+
+        cell_x, cell_y, side, distance, tex_u = hit
+        self.assertEqual((cell_x, cell_y, side), (3, 1, 0))
+        self.assertAlmostEqual(distance, 1.5)
+        self.assertAlmostEqual(tex_u, 0.25)
+
+    def test_cast_ray_along_negative_y(self):
+        hit = dda.cast_ray(self.level_map, 1.5, 1.25, 0.0, -1.0, 16)
+
+        cell_x, cell_y, side, distance, tex_u = hit
+        self.assertEqual((cell_x, cell_y, side), (1, 0, 1))
+        self.assertAlmostEqual(distance, 0.25)
+        self.assertAlmostEqual(tex_u, 0.5)
+
+    def test_cast_ray_diagonal(self):
+        angle = math.pi / 4
+        hit = dda.cast_ray(self.level_map, 1.5, 1.25, math.cos(angle), math.sin(angle), 16)
+
+        cell_x, cell_y, side, distance, tex_u = hit
+        self.assertEqual((cell_x, cell_y, side), (3, 2, 0))
+        self.assertAlmostEqual(distance, 1.5 * math.sqrt(2))
+        self.assertAlmostEqual(tex_u, 0.75)
+
+    def test_cast_ray_max_distance(self):
+        self.assertIsNone(dda.cast_ray(self.level_map, 1.5, 1.25, 1.0, 0.0, 1.4))
+
+    def test_cast_ray_leaves_map(self):
+        level_map = LevelMap("    ", 2, 2)
+        self.assertIsNone(dda.cast_ray(level_map, 0.5, 0.5, 1.0, 0.0, 16))
+
+    def test_cast_ray_matches_vector_cast(self):
+        """
+        The scalar and numpy kernels are the same algorithm, so should agree on every ray.
+        """
+        angles = np.linspace(0, math.tau, 97)
+        dir_x = np.cos(angles)
+        dir_y = np.sin(angles)
+        distance, cell_x, cell_y, side, _, tex_u = vector_cast.cast_rays(
+            vector_cast.build_wall_grid(self.level_map), 1.3, 2.1, dir_x, dir_y, 16
+        )
+
+        for i in range(angles.size):
+            hit = dda.cast_ray(self.level_map, 1.3, 2.1, dir_x[i], dir_y[i], 16)
+            self.assertEqual(hit[:3], (cell_x[i], cell_y[i], side[i]))
+            self.assertAlmostEqual(hit[3], distance[i])
+            self.assertAlmostEqual(hit[4], tex_u[i])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import pygame
+
+from engine.entities.game_object import GameObject
+from engine.level_objects.draw_list import DrawList, GameObjectGroup
+from engine.surfaces.surface_map import SurfaceMap
+
+
+class TestDrawList(unittest.TestCase):
+
+    def setUp(self):
+        self.surface_map = SurfaceMap(pygame.Surface((4, 4), depth=32), tile_size=4)
+        self.draw_list = DrawList()
+        self.enemies = GameObjectGroup()
+        self.bullets = GameObjectGroup()
+        self.enemies.set_draw_list(self.draw_list)
+        self.bullets.set_draw_list(self.draw_list)
+
+    def test_follows_groups(self):
+        enemy = GameObject(self.enemies, 1, 1, self.surface_map)
+        bullet = GameObject(self.bullets, 2, 2, self.surface_map)
+        self.assertEqual(self.draw_list.sprites(), [enemy, bullet])
+
+        bullet.kill()
+        self.assertEqual(self.draw_list.sprites(), [enemy])
+
+        self.enemies.empty()
+        self.assertEqual(len(self.draw_list), 0)
+
+    def test_existing_sprites_join_draw_list(self):
+        group = GameObjectGroup()
+        enemy = GameObject(group, 1, 1, self.surface_map)
+
+        group.set_draw_list(self.draw_list)
+        self.assertEqual(self.draw_list.sprites(), [enemy])
+
+    def test_sort_mixes_kinds(self):
+        near_enemy = GameObject(self.enemies, 1, 1, self.surface_map)
+        far_enemy = GameObject(self.enemies, 5, 5, self.surface_map)
+        far_bullet = GameObject(self.bullets, 8, 8, self.surface_map)
+
+        order = self.draw_list.sort([1.0, 5.0, 8.0])
+
+        self.assertEqual(order, [2, 1, 0])
+        self.assertEqual(self.draw_list.sprites(), [far_bullet, far_enemy, near_enemy])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import math
+import unittest
+
+import numpy as np
+
+from engine.rendering.floor_caster import FloorCaster
+
+
+class TestFloorCaster(unittest.TestCase):
+
+    def setUp(self):
+        # two 4x4 tiles, where each texel holds its own index within the tile, plus 100 for the second tile
+        tile = np.arange(16, dtype=np.uint32).reshape(4, 4)
+        self.textures = np.stack((tile, tile + 100))
+        self.floor_caster = FloorCaster(self.textures, 0, 1)
+
+    def test_rows_sample_world_position(self):
+        frame = np.zeros((8, 3), dtype=np.uint32)
+        origin_x, origin_y = 1.3, 2.6
+        dir_x = np.array([1.0, 0.8, 0.6])
+        dir_y = np.array([0.0, 0.6, 0.8])
+        fisheye_correction = np.array([1.0, 0.9, 0.8])
+
+        self.floor_caster.cast(frame, self.textures, origin_x, origin_y, dir_x, dir_y, fisheye_correction)
+
+        for row in range(4, 8):
+            distance = 8 / (2 * (row + 0.5 - 4))
+            for column in range(3):
+                world_x = origin_x + distance * dir_x[column] / fisheye_correction[column]
+                world_y = origin_y + distance * dir_y[column] / fisheye_correction[column]
+                expected = math.floor(world_x * 4) % 4 * 4 + math.floor(world_y * 4) % 4
+                self.assertEqual(frame[row, column], expected)
+                # the ceiling mirrors the floor
+                self.assertEqual(frame[7 - row, column], expected + 100)
+
+    def test_odd_height_leaves_horizon_row(self):
+        frame = np.zeros((7, 3), dtype=np.uint32)
+        dir_x = np.array([1.0, 0.8, 0.6])
+        dir_y = np.array([0.0, 0.6, 0.8])
+
+        # the middle row is on the horizon, so working out its distance would divide by zero
+        with np.errstate(all='raise'):
+            self.floor_caster.cast(frame, self.textures, 1.3, 2.6, dir_x, dir_y, np.ones(3))
+
+        self.assertTrue((frame[3] == 0).all())
+        self.assertTrue((frame[4:] < 100).all())
+        self.assertTrue((frame[:3] >= 100).all())
+
+    def test_skips_rows_behind_walls(self):
+        frame = np.zeros((8, 2), dtype=np.uint32)
+        ones = np.ones(2)
+
+        self.floor_caster.cast(frame, self.textures, 0.5, 0.5, ones, np.zeros(2), ones, np.array([4.0, 6.0]))
+
+        # the walls cover the middle 4 rows in every column, so only the outer 2 rows on each side get drawn
+        self.assertTrue((frame[2:6] == 0).all())
+        self.assertTrue((frame[6:] < 100).all())
+        self.assertTrue((frame[:2] >= 100).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from engine.asset_loaders.asset_cache import AssetCache
+from engine.asset_loaders.level_loader import LevelLoader
+
+
+class TestLevelLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = AssetCache()
+        self.level_data = {
+            "level_id": "test_level",
+            "name": "Test Level",
+            "map": {
+                "wall_texture": "walls.png",
+                "floor_texture": "walls.png",
+                "floor_tile": 5,
+                "ceiling_tile": 1,
+                "width": 4,
+                "height": 4,
+                "data": "0000" "0  1" "0  1" "2222"
+            },
+            "player_spawn": {"x": 1.5, "y": 1.5, "angle": 0.0},
+            "enemies": []
+        }
+
+    def test_floor_and_ceiling_tiles(self):
+        LevelLoader.validate_level_data(self.level_data)
+        level = LevelLoader.create_level_from_data(self.level_data, self.cache)
+
+        self.assertIsNotNone(level.floor_surface_map)
+        self.assertEqual((level.floor_tile, level.ceiling_tile), (5, 1))
+
+    def test_floor_tile_past_end_of_texture(self):
+        # walls.png has 6 tiles
+        self.level_data["map"]["ceiling_tile"] = 6
+
+        with self.assertRaises(ValueError):
+            LevelLoader.create_level_from_data(self.level_data, self.cache)
+
+        # nothing is left holding the textures
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+
+from engine.level_objects.levelmap import LevelMap
+
+
+class TestLevelMap(unittest.TestCase):
+
+    def setUp(self):
+        self.level_map = LevelMap(
+            "0000"
+            "0  1"
+            "0  1"
+            "2222",
+            4,
+            4
+        )
+
+    def test_cell_codes(self):
+        self.assertEqual(self.level_map.cells.dtype, np.uint8)
+        self.assertEqual(self.level_map.grid.shape, (4, 4))
+        self.assertEqual(self.level_map.get_cell(3.5, 1.2), 1)
+        self.assertEqual(self.level_map.get_cell(0, 3), 2)
+        self.assertEqual(self.level_map.get_cell(1.9, 2.9), LevelMap.EMPTY)
+        self.assertEqual(self.level_map.map_str, "0000" "0  1" "0  1" "2222")
+
+    def test_off_the_map(self):
+        for x, y in ((-0.5, 1), (4, 1), (1, -7), (1, 100)):
+            self.assertEqual(self.level_map.get_cell(x, y), LevelMap.BORDER)
+            self.assertTrue(self.level_map.is_wall(x, y))
+        self.assertFalse(self.level_map.is_wall(1.5, 1.5))
+
+    def test_batched_lookups(self):
+        xs = np.array([3.5, 1.5, -3.0, 2.0])
+        ys = np.array([1.2, 1.5, 1.0, 9.0])
+
+        self.assertEqual(self.level_map.get_cells(xs, ys).tolist(),
+                         [1, LevelMap.EMPTY, LevelMap.BORDER, LevelMap.BORDER])
+        self.assertEqual(self.level_map.are_walls(xs, ys).tolist(), [True, False, True, True])
+
+    def test_set_symbol(self):
+        self.level_map.set_symbol_at_map_xy(2, 1, '3')
+
+        self.assertEqual(self.level_map.get_cell(2, 1), 3)
+        self.assertEqual(self.level_map.get_symbol_at_map_xy(2, 1), '3')
+        self.assertEqual(self.level_map.version, 1)
+
+    def test_unknown_symbol(self):
+        with self.assertRaises(ValueError):
+            LevelMap("0x00", 2, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
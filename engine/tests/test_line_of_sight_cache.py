@@ -0,0 +1,41 @@
+import unittest
+
+from engine.level_objects.levelmap import LevelMap
+from engine.level_objects.line_of_sight_cache import LineOfSightCache
+
+
+class TestLineOfSightCache(unittest.TestCase):
+
+    def setUp(self):
+        self.level_map = LevelMap(
+            "00000"
+            "0   0"
+            "0 0 0"
+            "0   0"
+            "00000",
+            5,
+            5
+        )
+        self.cache = LineOfSightCache(self.level_map)
+
+    def test_walls_block(self):
+        sources = [(1.5, 1.5), (3.5, 3.5), (1.2, 3.7), (2.5, 3.5), (2.5, 1.5)]
+        self.assertEqual(self.cache.check_many(sources, 1.5, 3.5), [True, True, True, True, False])
+
+    def test_cached_per_square(self):
+        self.cache.check_many([(1.2, 1.2), (1.8, 1.9), (3.5, 3.5)], 1.5, 3.5)
+        self.cache.check_many([(1.5, 1.5)], 1.1, 3.9)
+
+        self.assertEqual(self.cache.stats(), {"hits": 2, "misses": 2, "hit_rate": 0.5, "entries": 2})
+
+    def test_emptied_when_map_changes(self):
+        self.assertEqual(self.cache.check_many([(1.5, 1.5)], 3.5, 1.5), [True])
+
+        self.level_map.set_symbol_at_map_xy(2, 1, '1')
+
+        self.assertEqual(self.cache.check_many([(1.5, 1.5)], 3.5, 1.5), [False])
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
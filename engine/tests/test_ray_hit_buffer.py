@@ -0,0 +1,59 @@
+import math
+import unittest
+
+import numpy as np
+
+from engine.rendering.ray_hit_buffer import RayHitBuffer
+from engine.utils.vector_cast import EMPTY_CELL
+
+
+class TestRayHitBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.ray_hits = RayHitBuffer(4)
+        self.ray_hits.set_hits(
+            slice(None),
+            np.array([1.0, 2.0, 4.0, math.inf]),
+            np.array([1, 2, 3, -1]),
+            np.array([0, 0, 0, -1]),
+            np.array([0, 1, 0, 0]),
+            np.array([1, 2, 3, EMPTY_CELL]),
+            np.array([0.1, 0.5, 0.99, 0.0])
+        )
+
+    def test_shift(self):
+        self.ray_hits.shift(1)
+        np.testing.assert_array_equal(self.ray_hits.texture_id[:3], [2, 3, EMPTY_CELL])
+        np.testing.assert_array_equal(self.ray_hits.distance[:3], [2.0, 4.0, math.inf])
+
+        self.ray_hits.shift(-2)
+        np.testing.assert_array_equal(self.ray_hits.texture_id[2:], [2, 3])
+        np.testing.assert_array_equal(self.ray_hits.cell_x[2:], [2, 3])
+
+    def test_project(self):
+        dir_x = np.array([1.0, 0.0, -1.0, 0.0])
+        dir_y = np.array([0.0, 1.0, 0.0, -1.0])
+        fisheye_correction = np.array([1.0, 0.5, 1.0, 1.0])
+
+        self.ray_hits.project(0.5, 0.5, dir_x, dir_y, fisheye_correction, 100)
+
+        np.testing.assert_allclose(self.ray_hits.perp_distance[:3], [1.0, 1.0, 4.0])
+        np.testing.assert_allclose(self.ray_hits.hit_x[:3], [1.5, 0.5, -3.5])
+        np.testing.assert_allclose(self.ray_hits.hit_y[:3], [0.5, 2.5, 0.5])
+        np.testing.assert_allclose(self.ray_hits.column_height, [100, 100, 25, 0])
+        np.testing.assert_allclose(self.ray_hits.column_top, [0, 0, 37.5, 50])
+
+    def test_visible_runs(self):
+        self.assertEqual(self.ray_hits.visible_runs(0, 4, 1.5), [(1, 4)])
+        self.assertEqual(self.ray_hits.visible_runs(0, 4, 3.0), [(2, 4)])
+        self.assertEqual(self.ray_hits.visible_runs(0, 2, 5.0), [])
+
+        self.ray_hits.distance[2] = 0.5
+        self.assertEqual(self.ray_hits.visible_runs(0, 4, 1.0), [(0, 2), (3, 4)])
+
+    def test_texture_columns(self):
+        np.testing.assert_array_equal(self.ray_hits.texture_columns(64)[:3], [6, 32, 63])
+
+
+if __name__ == '__main__':
+    unittest.main()
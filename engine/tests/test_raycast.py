@@ -0,0 +1,86 @@
+import math
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from engine.level_objects.levelmap import LevelMap
+from engine.utils import dda, raycast, vector_cast
+
+
+class TestRaycast(unittest.TestCase):
+
+    def setUp(self):
+        self.level_map = LevelMap(
+            "000000"
+            "0    1"
+            "0    1"
+            "222222",
+            6,
+            4
+        )
+
+    def test_query_wall(self):
+        hit = raycast.query(self.level_map, (1.5, 1.25), (1.0, 0.0), 16)
+
+        self.assertTrue(hit.hit_wall)
+        self.assertEqual((hit.cell_x, hit.cell_y, hit.side, hit.texture_id), (5, 1, 0, 1))
+        self.assertAlmostEqual(hit.distance, 3.5)
+        self.assertIsNone(hit.entity)
+
+    def test_query_nothing_in_range(self):
+        hit = raycast.query(self.level_map, (1.5, 1.25), (1.0, 0.0), 2)
+
+        self.assertFalse(hit.hit_wall)
+        self.assertEqual(hit.texture_id, vector_cast.EMPTY_CELL)
+
+    def test_query_first_entity(self):
+        near = SimpleNamespace(x=3.0, y=1.5)
+        far = SimpleNamespace(x=4.0, y=1.3)
+        off_line = SimpleNamespace(x=2.0, y=2.5)
+
+        hit = raycast.query(self.level_map, (1.5, 1.25), (1.0, 0.0), 16, [far, off_line, near])
+
+        self.assertIs(hit.entity, near)
+        # enters the circle round the entity half a chord before passing closest to it
+        self.assertAlmostEqual(hit.entity_distance, 1.5 - math.sqrt(0.25 - 0.25 ** 2))
+
+    def test_walls_hide_entities(self):
+        behind_wall = SimpleNamespace(x=1.5, y=3.5)
+
+        hit = raycast.query(self.level_map, (1.5, 1.5), (0.0, 1.0), 16, [behind_wall])
+
+        self.assertIsNone(hit.entity)
+        self.assertEqual(hit.texture_id, 2)
+
+    def test_query_many_backends_agree(self):
+        angles = np.linspace(0, math.tau, 61)
+        dir_xs = np.cos(angles)
+        dir_ys = np.sin(angles)
+        entities = [SimpleNamespace(x=4.0, y=2.0), SimpleNamespace(x=2.0, y=1.2)]
+
+        looped = raycast.query_many(self.level_map, (1.3, 2.1), dir_xs, dir_ys, 16, entities=entities)
+        vectorised = raycast.query_many(self.level_map, (1.3, 2.1), dir_xs, dir_ys, 16,
+                                        wall_grid=vector_cast.build_wall_grid(self.level_map), entities=entities)
+
+        for field in ('distance', 'cell_x', 'cell_y', 'side', 'texture_id', 'tex_u', 'entity_index'):
+            np.testing.assert_allclose(getattr(looped, field), getattr(vectorised, field))
+        self.assertEqual(set(looped.entity_index.tolist()), {-1, 0, 1})
+
+        for i in range(angles.size):
+            hit = raycast.query(self.level_map, (1.3, 2.1), (dir_xs[i], dir_ys[i]), 16, entities)
+            expected = entities[looped.entity_index[i]] if looped.entity_index[i] >= 0 else None
+            self.assertIs(hit.entity, expected)
+
+    def test_line_of_sight(self):
+        """
+        A ray whose direction is the whole way between two points has only hit a wall between them if it hits it
+        within a distance of 1
+        """
+        self.assertIsNone(dda.cast_ray(self.level_map, 1.5, 1.5, 3.0, 1.0, 1))
+        self.assertFalse(raycast.query(self.level_map, (1.5, 1.5), (3.0, 1.0), 1).hit_wall)
+        self.assertTrue(raycast.query(self.level_map, (1.5, 1.5), (0.0, 2.0), 1).hit_wall)
+
+
+if __name__ == '__main__':
+    unittest.main()
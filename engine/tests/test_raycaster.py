@@ -0,0 +1,237 @@
+import math
+import unittest
+from unittest import mock
+
+import numpy as np
+import pygame
+
+from engine.entities.game_object import GameObject
+from engine.level_objects.draw_list import GameObjectGroup
+from engine.level_objects.level import Level
+from engine.level_objects.levelmap import LevelMap
+from engine.raycaster import RayCaster
+from engine.surfaces.surface_map import SurfaceMap
+
+
+class TestRayCaster(unittest.TestCase):
+
+    def setUp(self):
+        level_map = LevelMap(
+            "0000"
+            "0  1"
+            "0  1"
+            "2222",
+            4,
+            4
+        )
+        textures = pygame.Surface((12, 4), depth=32)
+        textures.fill((200, 0, 0), pygame.Rect(0, 0, 4, 4))
+        textures.fill((0, 200, 0), pygame.Rect(4, 0, 4, 4))
+        textures.fill((0, 0, 200), pygame.Rect(8, 0, 4, 4))
+
+        self.level = Level(level_map, SurfaceMap(textures, tile_size=4), GameObjectGroup(), GameObjectGroup())
+        self.surface = pygame.Surface((32, 24), depth=32)
+
+    def _render(self, raycaster: RayCaster, x: float, y: float, angle: float):
+        self.surface.fill((0, 0, 0))
+        raycaster.cast(x, y, angle)
+        raycaster.render_game_objects(x, y, angle)
+
+    def _assert_camera_tables_match_column_angles(self, raycaster: RayCaster, fov: float, columns: int):
+        """
+        The tables should give the same rays as working out each column's angle from the player angle, the way cast
+        used to do it a column at a time
+        """
+        self.assertEqual(raycaster.camera_dir_x.shape, (columns,))
+
+        player_angle = 0.7
+        angles = player_angle - fov / 2 + fov * np.arange(columns) / columns
+        dir_x, dir_y = raycaster._get_ray_directions(player_angle)
+
+        np.testing.assert_allclose(dir_x, np.cos(angles), atol=1e-12)
+        np.testing.assert_allclose(dir_y, np.sin(angles), atol=1e-12)
+        np.testing.assert_allclose(raycaster.fisheye_correction, np.cos(angles - player_angle), atol=1e-12)
+
+    def test_camera_tables(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3)
+
+        self._assert_camera_tables_match_column_angles(raycaster, math.pi / 3, 32)
+
+    def test_camera_tables_rebuilt_by_set_view(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3)
+
+        raycaster.set_view(pygame.Surface((48, 24), depth=32), math.pi / 2)
+
+        self._assert_camera_tables_match_column_angles(raycaster, math.pi / 2, 48)
+
+    def test_render_scale_presents_scaled_up(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3, render_scale=0.5)
+
+        self.assertIsNot(raycaster.display_surface, self.surface)
+        self.assertEqual(raycaster.display_surface.get_size(), (16, 12))
+        self.assertEqual(raycaster.depth_map.shape, (16,))
+
+        self._render(raycaster, 1.5, 1.5, 0.0)
+        # nothing reaches the display until it's presented
+        self.assertEqual(tuple(self.surface.get_at((16, 12)))[:3], (0, 0, 0))
+
+        raycaster.present()
+
+        # the wall ahead fills the middle of the display, and the offscreen surface is cleared for the next frame
+        for x, y in ((8, 6), (16, 12), (24, 18)):
+            self.assertEqual(tuple(self.surface.get_at((x, y)))[:3], (0, 200, 0))
+        self.assertEqual(tuple(raycaster.display_surface.get_at((8, 6)))[:3], (0, 0, 0))
+
+    def test_full_render_scale_draws_to_display(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3)
+
+        self.assertIs(raycaster.display_surface, self.surface)
+
+        self._render(raycaster, 1.5, 1.5, 0.0)
+        self.assertEqual(tuple(self.surface.get_at((16, 12)))[:3], (0, 200, 0))
+
+        frame = pygame.image.tobytes(self.surface, 'RGBA')
+        raycaster.present()
+        self.assertEqual(pygame.image.tobytes(self.surface, 'RGBA'), frame)
+
+    def test_dev_mode_with_render_scale(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3, dev_mode=True, render_scale=0.5)
+
+        # the map takes the left half of the offscreen surface, and the scene is cast into the right half
+        self.assertEqual(raycaster.render_area_start, 8)
+        self.assertEqual(raycaster.render_area_width, 8)
+        self._assert_camera_tables_match_column_angles(raycaster, math.pi / 3, 8)
+
+        self._render(raycaster, 1.5, 1.5, 0.0)
+        raycaster.present()
+
+        # which ends up as the right half of the display, with no walls drawn over the map
+        self.assertEqual(tuple(self.surface.get_at((24, 12)))[:3], (0, 200, 0))
+        wall_colours = {(200, 0, 0), (0, 200, 0), (0, 0, 200)}
+        for x in range(16):
+            self.assertNotIn(tuple(self.surface.get_at((x, 12)))[:3], wall_colours)
+
+    def test_falls_back_to_single_process_without_workers(self):
+        with mock.patch('engine.raycaster.StripedRenderer', side_effect=OSError("no shared memory")):
+            raycaster = RayCaster(self.surface, self.level, math.pi / 3, render_workers=2)
+
+        self.assertIsNone(raycaster.striped_renderer)
+
+        self._render(raycaster, 1.5, 1.5, 0.0)
+        self.assertEqual(tuple(self.surface.get_at((16, 12)))[:3], (0, 200, 0))
+
+    def test_falls_back_to_single_process_when_a_worker_dies(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3, render_workers=2)
+        try:
+            worker = raycaster.striped_renderer._processes[0]
+            worker.terminate()
+            worker.join()
+
+            self._render(raycaster, 1.5, 1.5, 0.0)
+
+            self.assertIsNone(raycaster.striped_renderer)
+            self.assertEqual(tuple(self.surface.get_at((16, 12)))[:3], (0, 200, 0))
+        finally:
+            raycaster.close()
+
+    def test_frame_reused_when_nothing_changes(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3, frame_reuse=True)
+
+        self._render(raycaster, 1.5, 1.5, 0.3)
+        first_frame = pygame.image.tobytes(self.surface, 'RGBA')
+        self._render(raycaster, 1.5, 1.5, 0.3)
+
+        self.assertEqual(raycaster.reused_frame_count, 1)
+        self.assertEqual(pygame.image.tobytes(self.surface, 'RGBA'), first_frame)
+
+        # moving the camera means rendering again
+        self._render(raycaster, 1.6, 1.5, 0.3)
+        self.assertEqual(raycaster.reused_frame_count, 1)
+
+    def test_map_change_invalidates_frame(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3, frame_reuse=True)
+
+        self._render(raycaster, 1.5, 1.5, 0.0)
+        self.level.level_map.set_symbol_at_map_xy(2, 1, '2')
+        self._render(raycaster, 1.5, 1.5, 0.0)
+
+        self.assertEqual(raycaster.reused_wall_count, 0)
+        # the new wall is right in front of the camera, so it fills the middle of the screen
+        self.assertEqual(tuple(self.surface.get_at((16, 12)))[:3], (0, 0, 200))
+
+    def test_column_reuse_matches_full_cast(self):
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3, column_reuse=True)
+        reference = RayCaster(pygame.Surface((32, 24), depth=32), self.level, math.pi / 3, column_reuse=True)
+
+        raycaster.cast(1.5, 1.5, 0.3)
+        for turn in (0.1, -0.25, 0.02):
+            raycaster.cast(1.5, 1.5, 0.3 + turn)
+            # a fresh raycaster has nothing to reuse, so casts every column
+            reference._previous_camera = None
+            reference.cast(1.5, 1.5, 0.3 + turn)
+            np.testing.assert_allclose(raycaster.depth_map, reference.depth_map)
+
+        self.assertGreater(raycaster.reused_column_count, 0)
+        self.assertEqual(reference.reused_column_count, 0)
+
+    def test_camera_on_boundary_facing_wall(self):
+        """
+        Standing exactly on the edge of the wall's square, the middle ray hits it at distance 0
+        """
+        configurations = [{'backend': backend, 'wall_renderer': wall_renderer}
+                          for backend in RayCaster.BACKENDS for wall_renderer in RayCaster.WALL_RENDERERS]
+        configurations.append({'render_workers': 2})
+
+        for settings in configurations:
+            with self.subTest(**settings):
+                raycaster = RayCaster(self.surface, self.level, math.pi / 3, **settings)
+                try:
+                    self._render(raycaster, 1.5, 1.0, -math.pi / 2)
+
+                    if settings.get('render_workers'):
+                        self.assertIsNotNone(raycaster.striped_renderer)
+                    self.assertTrue(np.isfinite(raycaster.depth_map).all())
+                    self.assertEqual(tuple(self.surface.get_at((16, 0)))[:3], (200, 0, 0))
+                    self.assertEqual(tuple(self.surface.get_at((16, 23)))[:3], (200, 0, 0))
+                finally:
+                    raycaster.close()
+
+    def test_sprite_close_to_camera_is_clipped_to_screen(self):
+        sprite_texture = pygame.Surface((4, 4), depth=32)
+        sprite_texture.fill((255, 255, 255))
+        GameObject(self.level.enemies, 1.25, 1.5, SurfaceMap(sprite_texture, tile_size=4))
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3)
+
+        self._render(raycaster, 1.2, 1.5, 0.0)
+
+        # far bigger than the screen, so it covers all of it
+        for x, y in ((0, 0), (16, 12), (31, 23)):
+            self.assertEqual(tuple(self.surface.get_at((x, y)))[:3], (255, 255, 255))
+
+    def test_sprite_behind_wall_is_hidden(self):
+        sprite_texture = pygame.Surface((4, 4), depth=32)
+        sprite_texture.fill((255, 255, 255))
+        GameObject(self.level.enemies, 2.7, 1.5, SurfaceMap(sprite_texture, tile_size=4))
+        self.level.level_map.set_symbol_at_map_xy(2, 1, '2')
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3)
+
+        self._render(raycaster, 1.5, 1.5, 0.0)
+
+        self.assertEqual(tuple(self.surface.get_at((16, 12)))[:3], (0, 0, 200))
+
+    def test_objects_out_of_view_are_culled(self):
+        sprite_map = SurfaceMap(pygame.Surface((4, 4), depth=32), tile_size=4)
+        GameObject(self.level.enemies, 2.5, 1.5, sprite_map)  # in front
+        GameObject(self.level.enemies, 1.1, 1.5, sprite_map)  # behind
+        GameObject(self.level.bullets, 1.5, 2.5, sprite_map)  # off to the side
+        GameObject(self.level.bullets, 1.5, 1.5, sprite_map)  # on the camera
+        raycaster = RayCaster(self.surface, self.level, math.pi / 3)
+
+        self._render(raycaster, 1.5, 1.5, 0.0)
+
+        self.assertEqual(raycaster.drawn_object_count, 1)
+        self.assertEqual(raycaster.culled_object_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
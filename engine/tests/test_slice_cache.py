@@ -0,0 +1,72 @@
+import unittest
+
+import pygame
+
+from engine.surfaces.slice_cache import SliceCache
+from engine.surfaces.surface_tile import SurfaceTile
+
+
+class TestSliceCache(unittest.TestCase):
+
+    @staticmethod
+    def _slice(height: int) -> pygame.Surface:
+        return pygame.Surface((1, height), depth=32)
+
+    def test_quantize_height(self):
+        cache = SliceCache(1024, height_step=4)
+
+        self.assertEqual(cache.quantize_height(3), 3)
+        self.assertEqual(cache.quantize_height(9), 8)
+        self.assertEqual(cache.quantize_height(11), 12)
+
+    def test_get_and_put(self):
+        cache = SliceCache(1024)
+        tile_slice = self._slice(10)
+
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', tile_slice)
+
+        self.assertIs(cache.get('a'), tile_slice)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.used_bytes, 40)
+
+    def test_evicts_least_recently_used(self):
+        # room for two 10px slices at 4 bytes per pixel
+        cache = SliceCache(80)
+        cache.put('a', self._slice(10))
+        cache.put('b', self._slice(10))
+
+        # use 'a' so that 'b' is the least recently used
+        cache.get('a')
+        cache.put('c', self._slice(10))
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNotNone(cache.get('c'))
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.used_bytes, 80)
+
+    def test_oversized_slice_not_cached(self):
+        cache = SliceCache(20)
+        cache.put('a', self._slice(10))
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.used_bytes, 0)
+
+    def test_surface_tile_uses_cache(self):
+        tile = SurfaceTile(pygame.Surface((4, 4), depth=32))
+        SurfaceTile.slice_cache = SliceCache(1024, height_step=4)
+        try:
+            first = tile.get_scaled_slice_at_x(1, 17)
+            second = tile.get_scaled_slice_at_x(1, 15)
+        finally:
+            SurfaceTile.slice_cache = None
+
+        # both heights round to 16, so the second call is a hit
+        self.assertIs(first, second)
+        self.assertEqual(first.get_height(), 16)
+
+
+if __name__ == '__main__':
+    unittest.main()
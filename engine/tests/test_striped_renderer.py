@@ -0,0 +1,62 @@
+import math
+import unittest
+
+import numpy as np
+import pygame
+
+from engine.level_objects.levelmap import LevelMap
+from engine.rendering.striped_renderer import StripedRenderer
+from engine.rendering.wall_rasterizer import WallRasterizer, map_texture_array
+from engine.utils import vector_cast
+
+
+class TestStripedRenderer(unittest.TestCase):
+
+    def setUp(self):
+        level_map = LevelMap(
+            "0000"
+            "0  1"
+            "0  1"
+            "2222",
+            4,
+            4
+        )
+        self.wall_grid = vector_cast.build_wall_grid(level_map)
+
+        self.surface = pygame.Surface((32, 24), depth=32)
+        textures = np.random.default_rng(0).integers(0, 256, (3, 4, 4, 3), dtype=np.uint8)
+        self.textures = map_texture_array(textures, self.surface)
+
+        offsets = np.linspace(-0.5, 0.5, 32, endpoint=False)
+        self.camera_dir_x = np.cos(offsets)
+        self.camera_dir_y = np.sin(offsets)
+
+    def test_matches_single_process_rasterizer(self):
+        origin_x, origin_y, angle = 1.7, 1.4, 0.3
+
+        # render the same frame in one go in this process
+        dir_x = self.camera_dir_x * math.cos(angle) - self.camera_dir_y * math.sin(angle)
+        dir_y = self.camera_dir_x * math.sin(angle) + self.camera_dir_y * math.cos(angle)
+        distances, _, _, _, texture_ids, tex_us = vector_cast.cast_rays(
+            self.wall_grid, origin_x, origin_y, dir_x, dir_y, 24
+        )
+        expected = np.zeros((24, 32), dtype=np.uint32)
+        WallRasterizer(self.textures).rasterize(
+            expected, self.textures, texture_ids, np.minimum((tex_us * 4).astype(int), 3),
+            24 / (distances * self.camera_dir_x)
+        )
+
+        renderer = StripedRenderer(3, self.wall_grid, self.textures, self.camera_dir_x, self.camera_dir_y,
+                                   self.camera_dir_x, 24, 24)
+        try:
+            hits = renderer.render(self.surface, 0, origin_x, origin_y, angle)
+            np.testing.assert_array_equal(pygame.surfarray.array2d(self.surface).T, expected)
+            np.testing.assert_allclose(hits[0], distances)
+            np.testing.assert_array_equal(hits[4], texture_ids)
+            self.assertEqual(len(renderer.worker_timings), 3)
+        finally:
+            renderer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+import pygame
+
+from engine.surfaces.surface_map import SurfaceMap
+
+
+class TestSurfaceMap(unittest.TestCase):
+
+    def test_pixel_array(self):
+        surface = pygame.Surface((8, 8), pygame.SRCALPHA, depth=32)
+        surface.fill((200, 0, 0, 255), pygame.Rect(0, 0, 4, 4))
+        surface.fill((0, 200, 0, 255), pygame.Rect(4, 0, 4, 4))
+        surface.fill((0, 0, 200, 128), pygame.Rect(0, 4, 4, 4))
+        surface.fill((0, 0, 0, 255), pygame.Rect(4, 4, 4, 4))
+        surface.fill(SurfaceMap.OVERLAY_COLOR, pygame.Rect(5, 6, 1, 1))
+
+        surface_map = SurfaceMap(surface, tile_size=4)
+
+        self.assertEqual(surface_map.pixels.shape, (4, 4, 4, 4))
+        self.assertTrue(surface_map.pixels.flags.c_contiguous)
+        self.assertEqual(surface_map.pixels[1, 0, 0].tolist(), [0, 200, 0, 255])
+        self.assertEqual(surface_map.pixels[2, 3, 3].tolist(), [0, 0, 200, 128])
+
+        # the overlay is transparent, at x 1, y 2 within the last tile
+        self.assertEqual(surface_map.transparency.sum(), 1)
+        self.assertTrue(surface_map.transparency[3, 1, 2])
+
+    def test_slices_made_on_first_use(self):
+        surface_map = SurfaceMap(pygame.Surface((8, 4), depth=32), tile_size=4)
+        self.assertEqual(surface_map.get_slice_count(), 0)
+
+        tile = surface_map.get_tile_at(1, 0)
+        tile_slice = tile.get_slice_at_x(2)
+        self.assertIs(tile.get_slice_at_x(2), tile_slice)
+        self.assertEqual(tile_slice.get_abs_offset(), (6, 0))
+
+        surface_map.get_tile_slice(0, 0, 3, 8)
+        self.assertEqual(surface_map.get_slice_count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+import pygame
+
+from engine.surfaces.surface_tile import SurfaceTile
+
+
+class TestSurfaceTile(unittest.TestCase):
+
+    def setUp(self):
+        # a 4x4 tile with a different colour on each row
+        self.colours = [(200, 0, 0), (0, 200, 0), (0, 0, 200), (200, 200, 0)]
+        surface = pygame.Surface((4, 4), depth=32)
+        for y, colour in enumerate(self.colours):
+            surface.fill(colour, pygame.Rect(0, y, 4, 1))
+        self.tile = SurfaceTile(surface)
+
+    def test_clipped_slice_only_scales_visible_texels(self):
+        # 100px per texel, starting 150px above the screen, so the screen shows half of the second texel onwards
+        tile_slice, y = self.tile.get_clipped_slice_at_x(1, 400, -150, 200)
+
+        self.assertEqual(y, -50)
+        self.assertEqual(tile_slice.get_height(), 300)
+        self.assertEqual(tuple(tile_slice.get_at((0, 0)))[:3], self.colours[1])
+        self.assertEqual(tuple(tile_slice.get_at((0, 150)))[:3], self.colours[2])
+
+    def test_clipped_slice_with_texels_taller_than_screen(self):
+        # 1000px per texel, the boundary between the second and third texels is 100px down the screen
+        tile_slice, y = self.tile.get_clipped_slice_at_x(2, 4000, -1900, 200)
+
+        self.assertEqual(y, 0)
+        self.assertEqual(tile_slice.get_height(), 200)
+        self.assertEqual(tuple(tile_slice.get_at((0, 99)))[:3], self.colours[1])
+        self.assertEqual(tuple(tile_slice.get_at((0, 100)))[:3], self.colours[2])
+
+    def test_mip_levels(self):
+        surface = pygame.Surface((8, 8), depth=32)
+        surface.fill((0, 0, 0), pygame.Rect(0, 0, 4, 8))
+        surface.fill((200, 200, 200), pygame.Rect(4, 0, 4, 8))
+        tile = SurfaceTile(surface, mipmaps=True)
+
+        self.assertEqual([tile.get_mip_surface(h).get_height() for h in (20, 8, 5, 4, 2, 1)], [8, 8, 8, 4, 2, 1])
+        self.assertEqual(tile.get_mipmap_bytes(), (4 * 4 + 2 * 2 + 1) * 4)
+
+        # a mip level the right height is used as it is, and slices come from the same side of the smaller level
+        tile_slice = tile.get_scaled_slice_at_x(7, 4)
+        self.assertEqual(tile_slice.get_size(), (1, 4))
+        self.assertEqual(tuple(tile_slice.get_at((0, 0)))[:3], (200, 200, 200))
+
+        self.assertEqual(self.tile.get_mip_level(1), 0)
+        self.assertEqual(self.tile.get_mipmap_bytes(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
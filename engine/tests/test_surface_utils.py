@@ -0,0 +1,57 @@
+import os
+import unittest
+
+import pygame
+
+from engine.surfaces import surface_utils
+
+OVERLAY_COLOR = pygame.Color(178, 0, 255)
+
+
+class TestConvertForDisplay(unittest.TestCase):
+
+    def setUp(self):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.display.init()
+        self.display = pygame.display.set_mode((8, 8))
+
+    def tearDown(self):
+        pygame.display.quit()
+
+    def _texture(self, alpha: int) -> pygame.Surface:
+        texture = pygame.Surface((4, 4), pygame.SRCALPHA, depth=32)
+        texture.fill((10, 20, 30, 255))
+        texture.fill((10, 20, 30, alpha), pygame.Rect(0, 0, 2, 2))
+        return texture
+
+    def test_opaque_texture_drops_alpha(self):
+        converted = surface_utils.convert_for_display(self._texture(255), OVERLAY_COLOR)
+
+        self.assertFalse(converted.get_flags() & pygame.SRCALPHA)
+        self.assertEqual(converted.get_masks()[:3], self.display.get_masks()[:3])
+
+    def test_transparent_texture_keeps_alpha(self):
+        converted = surface_utils.convert_for_display(self._texture(100), OVERLAY_COLOR)
+
+        self.assertTrue(converted.get_flags() & pygame.SRCALPHA)
+        self.assertEqual(converted.get_at((0, 0)).a, 100)
+
+    def test_overlay_made_transparent(self):
+        texture = self._texture(255)
+        texture.fill(OVERLAY_COLOR, pygame.Rect(3, 3, 1, 1))
+
+        converted = surface_utils.convert_for_display(texture, OVERLAY_COLOR)
+
+        self.assertTrue(converted.get_flags() & pygame.SRCALPHA)
+        self.assertEqual(converted.get_at((3, 3)).a, 0)
+        self.assertFalse(converted.get_locked())
+
+    def test_no_display(self):
+        pygame.display.quit()
+        texture = self._texture(255)
+
+        self.assertIs(surface_utils.convert_for_display(texture, OVERLAY_COLOR), texture)
+
+
+if __name__ == '__main__':
+    unittest.main()
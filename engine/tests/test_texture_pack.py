@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pygame
+
+from engine.asset_loaders.texture_pack import TexturePack, build_texture_pack
+from engine.surfaces.surface_map import SurfaceMap
+
+
+class TestTexturePack(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.textures_dir = os.path.join(self.temp_dir.name, 'textures')
+        self.pack_path = os.path.join(self.temp_dir.name, 'textures.pack')
+        os.makedirs(os.path.join(self.textures_dir, 'enemies'))
+
+        texture = pygame.Surface((8, 4), pygame.SRCALPHA, depth=32)
+        texture.fill((200, 0, 0, 255), pygame.Rect(0, 0, 4, 4))
+        texture.fill((0, 0, 200, 255), pygame.Rect(4, 0, 4, 4))
+        texture.fill(SurfaceMap.OVERLAY_COLOR, pygame.Rect(5, 2, 1, 1))
+        self.texture_path = os.path.join(self.textures_dir, 'enemies', 'enemy.png')
+        pygame.image.save(texture, self.texture_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_matches_png(self):
+        build_texture_pack(self.textures_dir, self.pack_path, tile_size=4)
+        surface_map = TexturePack(self.pack_path, self.textures_dir).load_surface_map('enemies/enemy.png')
+
+        png_surface_map = SurfaceMap(pygame.image.load(self.texture_path), tile_size=4)
+        self.assertTrue(np.array_equal(surface_map.pixels, png_surface_map.pixels))
+        self.assertTrue(np.array_equal(surface_map.transparency, png_surface_map.transparency))
+        self.assertEqual(surface_map.get_tile_at(1, 0).surface.get_at((1, 2)), pygame.Color(0, 0, 0, 0))
+        self.assertEqual(surface_map.get_tile_at(1, 0).surface.get_at((0, 0)), pygame.Color(0, 0, 200, 255))
+
+    def test_mip_levels(self):
+        build_texture_pack(self.textures_dir, self.pack_path, mipmaps=True, tile_size=4)
+        pack = TexturePack(self.pack_path, self.textures_dir)
+
+        SurfaceMap.mipmaps = True
+        try:
+            surface_map = pack.load_surface_map('enemies/enemy.png')
+        finally:
+            SurfaceMap.mipmaps = False
+
+        mip_levels = surface_map.get_tile_at(0, 0).get_mip_levels()
+        self.assertEqual([mip_level.get_size() for mip_level in mip_levels], [(2, 2), (1, 1)])
+        self.assertEqual(mip_levels[1].get_at((0, 0)), pygame.Color(200, 0, 0, 255))
+
+    def test_stale_when_png_changes(self):
+        build_texture_pack(self.textures_dir, self.pack_path, tile_size=4)
+        pack = TexturePack(self.pack_path, self.textures_dir)
+        self.assertFalse(pack.is_stale('enemies/enemy.png'))
+        self.assertIsNone(pack.load_surface_map('enemies/missing.png'))
+
+        stat = os.stat(self.texture_path)
+        os.utime(self.texture_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertIsNone(pack.load_surface_map('enemies/enemy.png'))
+
+    def test_not_a_pack(self):
+        with open(self.pack_path, 'wb') as pack_file:
+            pack_file.write(b'not a texture pack')
+
+        with self.assertRaises(IOError):
+            TexturePack(self.pack_path, self.textures_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
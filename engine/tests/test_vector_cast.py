@@ -0,0 +1,64 @@
+import math
+import unittest
+
+import numpy as np
+
+from engine.level_objects.levelmap import LevelMap
+from engine.utils import vector_cast
+
+
+class TestVectorCast(unittest.TestCase):
+
+    def setUp(self):
+        level_map = LevelMap(
+            "0000"
+            "0  1"
+            "0  1"
+            "2222",
+            4,
+            4
+        )
+        self.wall_grid = vector_cast.build_wall_grid(level_map)
+
+    def test_build_wall_grid(self):
+        self.assertEqual(self.wall_grid.shape, (4, 4))
+        self.assertEqual(self.wall_grid[1, 3], 1)
+        self.assertEqual(self.wall_grid[3, 0], 2)
+        self.assertEqual(self.wall_grid[1, 1], vector_cast.EMPTY_CELL)
+
+    def test_cast_rays_along_axes(self):
+        dir_x = np.array([1.0, 0.0, -1.0])
+        dir_y = np.array([0.0, 1.0, 0.0])
+
+        distance, cell_x, cell_y, side, texture_id, tex_u = vector_cast.cast_rays(
+            self.wall_grid, 1.5, 1.25, dir_x, dir_y, 16
+        )
+
+        np.testing.assert_allclose(distance, [1.5, 1.75, 0.5])
+        np.testing.assert_array_equal(cell_x, [3, 1, 0])
+        np.testing.assert_array_equal(cell_y, [1, 3, 1])
+        np.testing.assert_array_equal(side, [0, 1, 0])
+        np.testing.assert_array_equal(texture_id, [1, 2, 0])
+        np.testing.assert_allclose(tex_u, [0.25, 0.5, 0.25])
+
+    def test_cast_rays_diagonal(self):
+        angle = math.pi / 4
+        distance, cell_x, cell_y, side, texture_id, _ = vector_cast.cast_rays(
+            self.wall_grid, 1.5, 1.25, np.array([math.cos(angle)]), np.array([math.sin(angle)]), 16
+        )
+
+        # crosses x=2 at y=1.75, then y=2 at x=2.25 and then x=3 at y=2.75, where the wall is
+        self.assertAlmostEqual(distance[0], 1.5 * math.sqrt(2))
+        self.assertEqual((cell_x[0], cell_y[0], side[0], texture_id[0]), (3, 2, 0, 1))
+
+    def test_cast_rays_max_distance(self):
+        distance, _, _, _, texture_id, _ = vector_cast.cast_rays(
+            self.wall_grid, 1.5, 1.25, np.array([1.0]), np.array([0.0]), 1.4
+        )
+
+        self.assertEqual(distance[0], math.inf)
+        self.assertEqual(texture_id[0], vector_cast.EMPTY_CELL)
+
+
+if __name__ == '__main__':
+    unittest.main()
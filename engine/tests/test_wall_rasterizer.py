@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+import pygame
+
+from engine.rendering.wall_rasterizer import WallRasterizer, build_texture_array
+from engine.surfaces.surface_map import SurfaceMap
+from engine.utils.vector_cast import EMPTY_CELL
+
+
+class TestWallRasterizer(unittest.TestCase):
+
+    def setUp(self):
+        # two 4x4 tiles side by side, the first red, the second with a different colour on each row
+        surface = pygame.Surface((8, 4), depth=32)
+        surface.fill((255, 0, 0), pygame.Rect(0, 0, 4, 4))
+        for y in range(4):
+            surface.fill((0, 0, 10 * (y + 1)), pygame.Rect(4, y, 4, 1))
+        self.surface_map = SurfaceMap(surface, tile_size=4)
+
+    def test_build_texture_array(self):
+        textures = build_texture_array(self.surface_map)
+
+        self.assertEqual(textures.shape, (2, 4, 4, 3))
+        self.assertEqual(tuple(textures[0, 3, 3]), (255, 0, 0))
+        self.assertEqual(tuple(textures[1, 2, 3]), (0, 0, 40))
+
+    def test_rasterize(self):
+        textures = np.arange(2 * 4 * 4, dtype=np.uint32).reshape(2, 4, 4) + 1
+        rasterizer = WallRasterizer(textures)
+        frame = np.zeros((8, 3), dtype=np.uint32)
+
+        rasterizer.rasterize(
+            frame,
+            textures,
+            np.array([1, EMPTY_CELL, 0]),
+            np.array([2, 0, 0]),
+            np.array([4.0, 0.0, 16.0])
+        )
+
+        # a wall 4px high is centred on the screen and each row is one texel of the texture column
+        np.testing.assert_array_equal(frame[:, 0], [0, 0, 25, 26, 27, 28, 0, 0])
+        # no wall, nothing drawn
+        np.testing.assert_array_equal(frame[:, 1], np.zeros(8))
+        # a wall taller than the screen only shows its middle, 4px per texel
+        np.testing.assert_array_equal(frame[:, 2], [2, 2, 2, 2, 3, 3, 3, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import math
+from typing import Optional, Tuple
+
+from engine.level_objects.levelmap import LevelMap
+
+
+def cast_ray(
+        level_map: LevelMap,
+        origin_x: float,
+        origin_y: float,
+        dir_x: float,
+        dir_y: float,
+        max_distance: float
+) -> Optional[Tuple[int, int, int, float, float]]:
+    """
+    Walks a single ray through the map one map square at a time (a DDA, or digital differential analyser) until it
+    hits a wall.
+
+    Rather than solving the linear equation of the ray to find where it next crosses a whole x or y, we work out once
+    how far along the ray it is between whole x's (delta_x) and between whole y's (delta_y). We then keep a running
+    distance to the next whole x and the next whole y (side_dist_x/y). Whichever is smaller is where the ray enters the
+    next map square, so each step is a comparison and an addition, with no square roots, and no special cases for
+    vertical or horizontal lines, as a ray which never crosses an axis just has an infinite distance to it.
+
+    :param level_map: map to walk through
+    :param origin_x: x location the ray starts from
+    :param origin_y: y location the ray starts from
+    :param dir_x: x component of the ray direction
+    :param dir_y: y component of the ray direction
+    :param max_distance: stop looking for a wall after travelling this far along the ray
+    :return: None if no wall was hit, otherwise (cell_x, cell_y, side, distance, tex_u). cell_x/cell_y are the map
+        square of the wall which was hit. side is 0 if the ray hit a face of the wall running along the y axis (i.e.
+        it crossed a whole x to get there) and 1 otherwise. distance is how far along the ray the wall is, in multiples
+        of the length of the direction vector, so for a unit direction it's the euclidean distance, and multiplying by
+        the cos of the ray's angle away from the centre of view gives the perpendicular distance from the camera
+        plane. tex_u is the fraction (0-1) along the wall face where the ray hit, for picking the texture slice.
+    """
+    cells = level_map.flat_cells
+    stride = level_map.stride
+    empty = LevelMap.EMPTY
+    border = LevelMap.BORDER
+
+    cell_x = math.floor(origin_x)
+    cell_y = math.floor(origin_y)
+
+    if dir_x < 0:
+        step_x = -1
+        delta_x = -1 / dir_x
+        side_dist_x = (origin_x - cell_x) * delta_x
+    elif dir_x > 0:
+        step_x = 1
+        delta_x = 1 / dir_x
+        side_dist_x = (cell_x + 1 - origin_x) * delta_x
+    else:
+        step_x = 0
+        delta_x = side_dist_x = math.inf
+
+    if dir_y < 0:
+        step_y = -1
+        delta_y = -1 / dir_y
+        side_dist_y = (origin_y - cell_y) * delta_y
+    elif dir_y > 0:
+        step_y = 1
+        delta_y = 1 / dir_y
+        side_dist_y = (cell_y + 1 - origin_y) * delta_y
+    else:
+        step_y = 0
+        delta_y = side_dist_y = math.inf
+
+    while True:
+        # Anything that happens in here will be called a *lot*.
+        if side_dist_x < side_dist_y:
+            distance = side_dist_x
+            cell_x += step_x
+            side_dist_x += delta_x
+            side = 0
+        else:
+            distance = side_dist_y
+            cell_y += step_y
+            side_dist_y += delta_y
+            side = 1
+
+        if distance > max_distance:
+            return None
+
+        # The map has a border round it, so a ray leaving the map lands on it before going any further, and the
+        # lookup never needs a bounds check
+        cell = cells[(cell_y + 1) * stride + cell_x + 1]
+        if cell != empty:
+            if cell == border:
+                return None  # left the map without hitting anything
+            break
+
+    # Walls crossed on the x axis run along y, so the fraction along the face comes from the y of the hit and vice
+    # versa.
+    if side == 0:
+        hit = origin_y + distance * dir_y
+    else:
+        hit = origin_x + distance * dir_x
+
+    return cell_x, cell_y, side, distance, hit - math.floor(hit)
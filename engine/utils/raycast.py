@@ -0,0 +1,210 @@
+import math
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine.entities.game_object import GameObject
+from engine.level_objects.levelmap import LevelMap
+from engine.utils import dda, vector_cast
+
+
+@dataclass
+class RaycastHit:
+    """
+    What a single ray hit, see query. The wall fields are for the first wall along the ray: cell_x/cell_y are -1,
+    texture_id is vector_cast.EMPTY_CELL and distance is infinite if there's no wall within the max distance.
+    Distances are in multiples of the length of the ray's direction, so for a unit direction they're in map squares.
+    """
+    cell_x: int
+    cell_y: int
+    side: int
+    distance: float
+    tex_u: float
+    texture_id: int
+    # the first of the entities the ray passed through before reaching the wall, if any
+    entity: Optional[GameObject] = None
+    entity_distance: float = math.inf
+
+    @property
+    def hit_wall(self) -> bool:
+        return self.distance != math.inf
+
+
+@dataclass
+class RaycastHits:
+    """
+    What a batch of rays hit, see query_many. The wall fields are arrays with one entry per ray, in the same form as
+    vector_cast.cast_rays returns them. entity_index is the index in the entities asked about of the first one each ray
+    passed through before reaching a wall, -1 for none.
+    """
+    distance: np.ndarray
+    cell_x: np.ndarray
+    cell_y: np.ndarray
+    side: np.ndarray
+    texture_id: np.ndarray
+    tex_u: np.ndarray
+    entity_index: np.ndarray
+    entity_distance: np.ndarray
+
+    def walls(self) -> tuple:
+        """
+        The wall fields as a tuple, in the order vector_cast.cast_rays returns them
+        """
+        return self.distance, self.cell_x, self.cell_y, self.side, self.texture_id, self.tex_u
+
+
+def query(
+        level_map: LevelMap,
+        origin: Tuple[float, float],
+        direction: Tuple[float, float],
+        max_distance: float,
+        entities: Sequence[GameObject] = (),
+        entity_radius: float = 0.5
+) -> RaycastHit:
+    """
+    Casts a single ray through the map with the DDA (see dda.cast_ray), and finds the first of the entities it passes
+    through before the wall it hits, treating each entity as a circle of entity_radius around its location.
+
+    :param origin: (x, y) the ray starts from
+    :param direction: (x, y) direction of the ray, which needn't be a unit vector
+    :param max_distance: stop looking for a wall or an entity after travelling this far along the ray
+    :param entities: the entities which can be hit, e.g. the level's enemies
+    """
+    origin_x, origin_y = origin
+    dir_x, dir_y = direction
+
+    hit = dda.cast_ray(level_map, origin_x, origin_y, dir_x, dir_y, max_distance)
+    if hit is None:
+        result = RaycastHit(-1, -1, 0, math.inf, 0.0, vector_cast.EMPTY_CELL)
+    else:
+        cell_x, cell_y, side, distance, tex_u = hit
+        result = RaycastHit(cell_x, cell_y, side, distance, tex_u, level_map.get_cell(cell_x, cell_y))
+
+    if entities:
+        entity_index, entity_distance = first_entities_hit(
+            origin_x, origin_y, np.array([dir_x]), np.array([dir_y]), np.array([min(result.distance, max_distance)]),
+            entities, entity_radius
+        )
+        if entity_index[0] >= 0:
+            result.entity = entities[entity_index[0]]
+            result.entity_distance = float(entity_distance[0])
+
+    return result
+
+
+def query_many(
+        level_map: LevelMap,
+        origin: Tuple[float, float],
+        dir_xs: np.ndarray,
+        dir_ys: np.ndarray,
+        max_distance: float,
+        wall_grid: Optional[np.ndarray] = None,
+        entities: Sequence[GameObject] = (),
+        entity_radius: float = 0.5
+) -> RaycastHits:
+    """
+    Casts a batch of rays from one origin, like query.
+
+    :param dir_xs: x component of each ray's direction
+    :param dir_ys: y component of each ray's direction
+    :param wall_grid: the map as from vector_cast.build_wall_grid, to walk all the rays at once with numpy. Without it,
+        each ray is walked in turn with the DDA, which is quicker for a handful of rays.
+    """
+    origin_x, origin_y = origin
+
+    if wall_grid is not None:
+        walls = vector_cast.cast_rays(wall_grid, origin_x, origin_y, dir_xs, dir_ys, max_distance)
+    else:
+        walls = _cast_each(level_map, origin_x, origin_y, dir_xs, dir_ys, max_distance)
+
+    if entities:
+        entity_index, entity_distance = first_entities_hit(
+            origin_x, origin_y, dir_xs, dir_ys, np.minimum(walls[0], max_distance), entities, entity_radius
+        )
+    else:
+        entity_index = np.full(dir_xs.shape[0], -1, dtype=np.intp)
+        entity_distance = np.full(dir_xs.shape[0], np.inf)
+
+    return RaycastHits(*walls, entity_index, entity_distance)
+
+
+def _cast_each(level_map: LevelMap, origin_x: float, origin_y: float, dir_xs: np.ndarray, dir_ys: np.ndarray,
+               max_distance: float) -> tuple:
+    """
+    Casts each ray in turn, stepping it through the map squares with the DDA kernel until it hits a wall.
+
+    :return: (distance, cell_x, cell_y, side, texture_id, tex_u) arrays, in the same form as vector_cast.cast_rays
+    """
+    cells = level_map.flat_cells
+    stride = level_map.stride
+
+    distances = []
+    cell_xs = []
+    cell_ys = []
+    sides = []
+    texture_ids = []
+    tex_us = []
+
+    for dir_x, dir_y in zip(dir_xs.tolist(), dir_ys.tolist()):
+        hit = dda.cast_ray(level_map, origin_x, origin_y, dir_x, dir_y, max_distance)
+
+        if hit is None:  # nothing within max distance
+            distances.append(math.inf)
+            cell_xs.append(-1)
+            cell_ys.append(-1)
+            sides.append(0)
+            texture_ids.append(vector_cast.EMPTY_CELL)
+            tex_us.append(0.0)
+            continue
+
+        cell_x, cell_y, side, ray_dist, tex_u = hit
+        distances.append(ray_dist)
+        cell_xs.append(cell_x)
+        cell_ys.append(cell_y)
+        sides.append(side)
+        texture_ids.append(cells[(cell_y + 1) * stride + cell_x + 1])
+        tex_us.append(tex_u)
+
+    return (np.array(distances), np.array(cell_xs), np.array(cell_ys), np.array(sides), np.array(texture_ids),
+            np.array(tex_us))
+
+
+def first_entities_hit(
+        origin_x: float,
+        origin_y: float,
+        dir_xs: np.ndarray,
+        dir_ys: np.ndarray,
+        max_distances: np.ndarray,
+        entities: Sequence[GameObject],
+        entity_radius: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For each ray, the first entity whose circle of entity_radius the ray enters before max_distance along it (so an
+    entity right up against the wall a ray hits is hidden by the wall). Every ray is tested against every entity at
+    once, as a (rays, entities) array.
+
+    A ray at its closest to an entity's centre is `along` multiples of its direction from the origin, and enters the
+    circle half a chord before that, where the chord's length comes from how close it passes (pythagoras).
+
+    :return: the index in entities of the entity each ray hits first, -1 if none, and how far along the ray it enters
+        the entity's circle (0 if the ray starts inside it, infinite if none)
+    """
+    to_xs = np.array([entity.x for entity in entities]) - origin_x
+    to_ys = np.array([entity.y for entity in entities]) - origin_y
+
+    dir_len_sq = (dir_xs * dir_xs + dir_ys * dir_ys)[:, np.newaxis]
+    along = (dir_xs[:, np.newaxis] * to_xs + dir_ys[:, np.newaxis] * to_ys) / dir_len_sq
+    closest_sq = to_xs * to_xs + to_ys * to_ys - along * along * dir_len_sq
+
+    radius_sq = entity_radius * entity_radius
+    half_chord = np.sqrt(np.maximum(radius_sq - closest_sq, 0) / dir_len_sq)
+    entry = np.maximum(along - half_chord, 0)
+
+    hits = (closest_sq < radius_sq) & (along + half_chord >= 0) & (entry < max_distances[:, np.newaxis])
+    entry[~hits] = np.inf
+
+    entity_index = np.argmin(entry, axis=1)
+    entity_distance = entry[np.arange(entry.shape[0]), entity_index]
+    entity_index[entity_distance == np.inf] = -1
+    return entity_index, entity_distance
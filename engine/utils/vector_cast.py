@@ -0,0 +1,110 @@
+import numpy as np
+
+from engine.level_objects.levelmap import LevelMap
+
+# Value used in wall grids for map squares which don't contain a wall
+EMPTY_CELL = -1
+
+
+def build_wall_grid(level_map: LevelMap) -> np.ndarray:
+    """
+    Converts the cells of a LevelMap into a 2d array of wall texture ids, indexed [y, x], so that whole batches of rays
+    can look up the map in one go. Empty squares are EMPTY_CELL.
+    """
+    grid = level_map.grid.astype(np.int16)
+    grid[level_map.grid == LevelMap.EMPTY] = EMPTY_CELL
+    return grid
+
+
+def cast_rays(
+        wall_grid: np.ndarray,
+        origin_x: float,
+        origin_y: float,
+        dir_x: np.ndarray,
+        dir_y: np.ndarray,
+        max_distance: float
+) -> tuple:
+    """
+    Walks a whole batch of rays through the map at once. Rather than handling one ray at a time, every ray which
+    hasn't hit anything yet is advanced by one map square per iteration, so the python loop only runs as many times as
+    the longest ray needs steps, and all the per-ray maths happens in numpy.
+
+    This is the same DDA as dda.cast_ray: each ray keeps track of the distance along the ray to the next whole x and
+    the next whole y (the side distances), and whichever is nearer is the next map square the ray enters.
+
+    :param wall_grid: map as returned by build_wall_grid
+    :param origin_x: x location of the camera
+    :param origin_y: y location of the camera
+    :param dir_x: x component of each ray's (unit) direction
+    :param dir_y: y component of each ray's (unit) direction
+    :param max_distance: give up on rays which haven't hit a wall after travelling this far
+    :return: (distance, cell_x, cell_y, side, texture_id, tex_u) arrays with one entry per ray. side is 0 when the ray
+        hit a wall face running along the y axis (i.e. it crossed a whole x), 1 otherwise. tex_u is the fraction along
+        the wall face where the ray hit, for picking the texture slice. Rays which didn't hit anything have an
+        infinite distance and a texture_id of EMPTY_CELL.
+    """
+    ray_count = dir_x.shape[0]
+    map_h, map_w = wall_grid.shape
+
+    cell_x = np.full(ray_count, int(np.floor(origin_x)), dtype=np.int64)
+    cell_y = np.full(ray_count, int(np.floor(origin_y)), dtype=np.int64)
+
+    # distance along the ray between whole x's (or whole y's). Rays parallel to an axis never cross the other axis.
+    with np.errstate(divide='ignore'):
+        delta_x = np.abs(1 / dir_x)
+        delta_y = np.abs(1 / dir_y)
+
+    step_x = np.where(dir_x < 0, -1, 1)
+    step_y = np.where(dir_y < 0, -1, 1)
+
+    with np.errstate(invalid='ignore'):
+        side_dist_x = np.where(dir_x < 0, (origin_x - cell_x) * delta_x, (cell_x + 1 - origin_x) * delta_x)
+        side_dist_y = np.where(dir_y < 0, (origin_y - cell_y) * delta_y, (cell_y + 1 - origin_y) * delta_y)
+    side_dist_x[dir_x == 0] = np.inf
+    side_dist_y[dir_y == 0] = np.inf
+
+    distance = np.full(ray_count, np.inf)
+    side = np.zeros(ray_count, dtype=np.int8)
+    texture_id = np.full(ray_count, EMPTY_CELL, dtype=np.int16)
+
+    # indices of the rays still travelling
+    active = np.arange(ray_count)
+
+    while active.size:
+        sdx = side_dist_x[active]
+        sdy = side_dist_y[active]
+        crosses_x = sdx < sdy
+
+        # distance along the ray at which it enters the next square
+        travelled = np.where(crosses_x, sdx, sdy)
+
+        cell_x[active] += np.where(crosses_x, step_x[active], 0)
+        cell_y[active] += np.where(crosses_x, 0, step_y[active])
+        side_dist_x[active] = np.where(crosses_x, sdx + delta_x[active], sdx)
+        side_dist_y[active] = np.where(crosses_x, sdy, sdy + delta_y[active])
+
+        cx = cell_x[active]
+        cy = cell_y[active]
+        in_bounds = (cx >= 0) & (cx < map_w) & (cy >= 0) & (cy < map_h)
+        cells = np.full(active.size, EMPTY_CELL, dtype=np.int16)
+        cells[in_bounds] = wall_grid[cy[in_bounds], cx[in_bounds]]
+
+        in_range = travelled <= max_distance
+        hit = (cells != EMPTY_CELL) & in_range
+        hit_rays = active[hit]
+        distance[hit_rays] = travelled[hit]
+        side[hit_rays] = np.where(crosses_x[hit], 0, 1)
+        texture_id[hit_rays] = cells[hit]
+
+        # rays which hit a wall, left the map or went past the max distance are done
+        active = active[~hit & in_bounds & in_range]
+
+    # Where along the wall face the rays hit. Walls crossed on the x axis run along y, so use the y fraction and vice
+    # versa.
+    with np.errstate(invalid='ignore'):
+        hit_x = origin_x + distance * dir_x
+        hit_y = origin_y + distance * dir_y
+        tex_u = np.where(side == 0, hit_y - np.floor(hit_y), hit_x - np.floor(hit_x))
+    tex_u[texture_id == EMPTY_CELL] = 0
+
+    return distance, cell_x, cell_y, side, texture_id, tex_u